@@ -1,22 +1,110 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify
 import os
-import cv2
-import numpy as np
-import csv
-import io
 import base64
-from PIL import Image
-import subprocess
-import tempfile
 import json
+import threading
+import time
+from functools import lru_cache
+
+# OpenCV, Pillow and pytesseract load on the first upload or rendered image,
+# so solving alone never imports them
+from job_queue import DONE, FAILED, JobQueue, QueueFull
+from metrics import NODE_BUCKETS, REGISTRY, collect_timings, finish_timings, server_timing_header, timed
+from ocr_cache import OcrCache
+from solution_cache import SolutionCache, grid_key
+from sudoku_core import (
+    DEFAULT_SOLVER, SearchBudgetExceeded, SearchStats, find_solutions, flatten_grid, format_puzzle_line, get_solver, is_solution,
+    line_to_grid, parse_puzzle_line, save_sudoku_to_csv, write_cells_csv,
+)
+from sudoku_core.ocr import OCR_MODES, default_ocr_mode, find_tesseract_cmd
+from sudoku_core.render import IMAGE_FORMATS, WEB_STYLE, encode_image, render_bytes, render_image
+from sudoku_symmetry import canonicalize
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-# Ensure upload folder exists
-UPLOAD_FOLDER = 'uploads'
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# Solved puzzles keyed by grid hash; set SOLUTION_CACHE_DIR to keep them across restarts
+solution_cache = SolutionCache(
+    max_entries=int(os.environ.get('SOLUTION_CACHE_SIZE', 1024)),
+    cache_dir=os.environ.get('SOLUTION_CACHE_DIR') or None,
+)
+# One solution per symmetry class (transposition, band/stack and row/column swaps, relabeling)
+# for puzzles with a unique solution. Canonicalizing costs about 5 ms, more than most solves,
+# so a puzzle is only looked up here once its solve has passed SYMMETRY_MIN_NODES.
+symmetry_cache = SolutionCache(
+    max_entries=int(os.environ.get('SYMMETRY_CACHE_SIZE', 8192)),
+    cache_dir=os.environ.get('SOLUTION_CACHE_DIR') or None,
+    name='symmetry',
+)
+# About 10 ms of bitmask search. DLX gets through hard puzzles fast enough (p99 about 25 ms)
+# that canonicalizing did not pay off in bench runs, so it never looks up symmetric copies.
+SYMMETRY_MIN_NODES = {'bitmask': 150}
+
+# Recognized grids keyed by a perceptual hash of the warped photo, so re-uploads skip OCR.
+ocr_cache = OcrCache(max_entries=int(os.environ.get('OCR_CACHE_SIZE', 256)))
+
+# Uploads and results stay in memory per request. Set SAVE_CSV_OUTPUTS=1 to also
+# write sudoku_grid.csv / sudoku_cells.csv / sudoku_solution.csv (shared files,
+# so only safe with a single worker).
+SAVE_CSV_OUTPUTS = os.environ.get('SAVE_CSV_OUTPUTS', '').lower() in ('1', 'true', 'yes')
+
+# Digit recognizer: per-cell Tesseract ('cell') when installed, else the built-in 'knn' classifier.
+# 'batch' (one Tesseract call per grid) is opt-in until bench_pipeline shows it is as accurate.
+OCR_MODE = os.environ.get('OCR_MODE') or default_ocr_mode()
+if OCR_MODE not in OCR_MODES:
+    raise ValueError(f"Unknown OCR_MODE '{OCR_MODE}'. Choose from: {', '.join(OCR_MODES)}")
+# Concurrent per-cell Tesseract calls per upload; OCR_MAX_THREADS caps them across uploads.
+OCR_THREADS = int(os.environ.get('OCR_THREADS', 4))
+
+# Per-request limits of POST /solve/batch
+BATCH_MAX_PUZZLES = int(os.environ.get('BATCH_MAX_PUZZLES', 1000))
+BATCH_CPU_SECONDS = float(os.environ.get('BATCH_CPU_SECONDS', 10))
+
+# Encoded solution images served by GET /solve/image/..., kept in memory by URL
+IMAGE_CACHE_SIZE = int(os.environ.get('IMAGE_CACHE_SIZE', 512))
+IMAGE_MAX_AGE = 365 * 24 * 3600  # image URLs are content-addressed, so they never change
+
+# Prometheus metrics at GET /metrics; SERVER_TIMING=1 also adds a per-response Server-Timing header
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+HTTP_REQUESTS = REGISTRY.counter('sudoku_http_requests_total', 'HTTP requests by view and status.', ('endpoint', 'status'))
+HTTP_SECONDS = REGISTRY.histogram('sudoku_http_request_seconds', 'Time to build a response (streams excluded).', ('endpoint',))
+SOLVE_LOOKUPS = REGISTRY.counter('sudoku_solve_lookups_total', 'Solves by cache tier (exact, symmetry or miss).', ('tier',))
+SOLVER_NODES = REGISTRY.counter('sudoku_solver_nodes_total', 'Search nodes visited by the solver.', ('solver',))
+SOLVER_BACKTRACKS = REGISTRY.counter('sudoku_solver_backtracks_total', 'Dead ends the solver backtracked from.', ('solver',))
+SOLVE_NODES = REGISTRY.histogram('sudoku_solver_nodes', 'Search nodes per uncached solve.', ('solver',), NODE_BUCKETS)
+
+# Background detect + solve jobs for POST /upload?async=1
+job_queue = JobQueue(
+    workers=int(os.environ.get('JOB_WORKERS', 2)),
+    max_pending=int(os.environ.get('JOB_QUEUE_SIZE', 16)),
+    ttl=float(os.environ.get('JOB_RESULT_TTL', 300)),
+    store_dir=os.environ.get('JOB_STORE_DIR') or None,
+)
+# Without JOB_STORE_DIR jobs live in this process's memory, so async uploads are refused
+# when several server processes share the traffic (gunicorn.conf.py sets the real count)
+WORKER_PROCESSES = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Each /jobs/<id>/events stream holds a server thread until its job finishes
+JOB_EVENT_STREAMS = int(os.environ.get('JOB_EVENT_STREAMS', 4))
+event_streams = threading.BoundedSemaphore(JOB_EVENT_STREAMS)
+
+@app.before_request
+def start_request_timing():
+    request.environ['sudoku.timing'] = (time.perf_counter(), collect_timings())
+
+@app.after_request
+def finish_request_timing(response):
+    start, token = request.environ.pop('sudoku.timing', (None, None))
+    if token is None:
+        return response
+    timings = finish_timings(token)
+    elapsed = time.perf_counter() - start
+    endpoint = request.endpoint or 'unmatched'
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    HTTP_SECONDS.observe(elapsed, endpoint=endpoint)
+    if SERVER_TIMING:
+        timings['total'] = elapsed
+        response.headers['Server-Timing'] = server_timing_header(timings)
+    return response
 
 @app.route('/')
 def index():
@@ -32,19 +120,35 @@ def upload_image():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Save uploaded image temporarily
-        temp_path = os.path.join(UPLOAD_FOLDER, 'temp_sudoku.png')
-        file.save(temp_path)
+        # ?async=1 queues detect + solve and returns a job id right away
+        if request.values.get('async', '').lower() in ('1', 'true', 'yes'):
+            if WORKER_PROCESSES != 1 and not job_queue.shared:
+                return jsonify({'error': 'Async uploads need JOB_STORE_DIR or a single server process; upload without async=1'}), 503
+            image_bytes = file.read()
+            method = request.values.get('method', DEFAULT_SOLVER)
+            try:
+                get_solver(method)
+                job = job_queue.submit(lambda report: run_upload_job(image_bytes, method, report))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except QueueFull:
+                response = jsonify({'error': 'Too many images in the queue, try again shortly'})
+                response.headers['Retry-After'] = '5'
+                return response, 429
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status_url': f'/jobs/{job.id}',
+                'events_url': f'/jobs/{job.id}/events',
+            }), 202
         
-        # Run Sudoku detection
-        result = run_sudoku_detection(temp_path)
+        # Run Sudoku detection on the uploaded bytes
+        result = run_sudoku_detection(file.read())
         
         if result['success']:
-            # Read the detected grid
-            grid = read_sudoku_from_csv('sudoku_grid.csv')
             return jsonify({
                 'success': True,
-                'grid': grid.tolist(),
+                'grid': result['grid'].tolist(),
                 'message': 'Sudoku detected successfully'
             })
         else:
@@ -57,168 +161,298 @@ def upload_image():
 def solve_sudoku():
     try:
         data = request.get_json()
-        grid = np.array(data['grid'])
+        grid = data['grid']
+        method = data.get('method', DEFAULT_SOLVER)
+        # No 'format': inline base64 PNG as before; otherwise a URL to the image (or none)
+        image_format = data.get('format')
+        try:
+            get_solver(method)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if image_format is not None and image_format != 'none' and image_format not in IMAGE_FORMATS:
+            return jsonify({'error': f"Unknown format '{image_format}'. Choose from: none, {', '.join(IMAGE_FORMATS)}"}), 400
         
-        # Solve the Sudoku
-        solution = grid.copy()
-        if solve_sudoku_backtrack(solution):
-            # Save solution to CSV
-            save_sudoku_to_csv(solution, 'sudoku_solution.csv')
-            
-            # Create solution image
-            solution_image = create_solution_image(solution)
-            
-            # Convert to base64 for display
-            _, buffer = cv2.imencode('.png', solution_image)
-            img_base64 = base64.b64encode(buffer).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'solution': solution.tolist(),
-                'image': img_base64,
-                'message': 'Sudoku solved successfully'
-            })
-        else:
+        start = time.perf_counter()
+        result, cached = solve_grid(grid, method, render=image_format is None)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        if result is None:
             return jsonify({'error': 'No solution found for this Sudoku puzzle'}), 400
+        
+        if SAVE_CSV_OUTPUTS:
+            save_sudoku_to_csv(result['solution'], 'sudoku_solution.csv')
+        
+        response = {
+            'success': True,
+            'solution': result['solution'],
+            'unique': result['unique'],
+            'cached': cached or False,
+            'solver': method,
+            # A cache hit did no solving: report how long the lookup took instead
+            'lookup_ms' if cached == 'exact' else 'solve_ms': elapsed_ms,
+            'message': 'Sudoku solved successfully'
+        }
+        if image_format is None:
+            response['image'] = result['image']
+        elif image_format != 'none':
+            response['image_url'] = solution_image_url(flatten_grid(grid), flatten_grid(result['solution']), image_format)
+        return jsonify(response)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def run_sudoku_detection(image_path):
-    """Run Sudoku detection using the existing script"""
+@app.route('/solve/batch', methods=['POST'])
+def solve_batch_route():
+    """Solve many puzzles from a JSON array or NDJSON body, streaming one NDJSON line per puzzle"""
+    method = request.args.get('method', DEFAULT_SOLVER)
+    render = request.args.get('images', '').lower() in ('1', 'true', 'yes')
     try:
-        # Check if sudoku_to_csv.py exists
-        if not os.path.exists('sudoku_to_csv.py'):
-            return {'success': False, 'error': 'Detection script not found'}
-        
-        # Run detection command
-        cmd = [
-            "python", "sudoku_to_csv.py",
-            "--image", image_path,
-            "--out-grid", "sudoku_grid.csv",
-            "--out-cells", "sudoku_cells.csv"
-        ]
-        
-        # Check if tesseract path exists
-        tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-        if os.path.exists(tesseract_path):
-            cmd.extend(["--tesseract", tesseract_path])
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
-        
-        if result.returncode == 0:
-            return {'success': True}
+        get_solver(method)
+        body = request.get_data(as_text=True)
+        if body.lstrip().startswith('['):
+            items = json.loads(body)
         else:
-            return {'success': False, 'error': result.stderr}
-            
-    except Exception as e:
-        return {'success': False, 'error': str(e)}
-
-def read_sudoku_from_csv(csv_file):
-    """Read Sudoku puzzle from CSV file"""
-    grid = []
-    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-        reader = csv.reader(file)
-        for row in reader:
-            grid.append([int(cell) for cell in row])
-    return np.array(grid)
-
-def is_valid(grid, row, col, num):
-    """Check if placing 'num' at position (row, col) is valid"""
-    # Check row
-    for x in range(9):
-        if grid[row][x] == num:
-            return False
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(items) > BATCH_MAX_PUZZLES:
+        return jsonify({'error': f'At most {BATCH_MAX_PUZZLES} puzzles per request'}), 413
     
-    # Check column
-    for x in range(9):
-        if grid[x][col] == num:
-            return False
+    def stream():
+        # CPU time of this request's thread; checked between puzzles
+        cpu_start = time.thread_time()
+        for index, item in enumerate(items):
+            if time.thread_time() - cpu_start > BATCH_CPU_SECONDS:
+                yield json.dumps({
+                    'index': index,
+                    'success': False,
+                    'error': f'CPU time limit of {BATCH_CPU_SECONDS:g}s exceeded',
+                    'skipped': len(items) - index,
+                }) + '\n'
+                return
+            line = {'index': index}
+            try:
+                puzzle_id, cells, as_line = parse_batch_puzzle(item)
+                if puzzle_id is not None:
+                    line['id'] = puzzle_id
+                start = time.perf_counter()
+                result, cached = solve_grid([cells[r * 9:(r + 1) * 9] for r in range(9)], method, render)
+                if result is None:
+                    line.update({'success': False, 'error': 'No solution found'})
+                else:
+                    solution = result['solution']
+                    line.update({
+                        'success': True,
+                        'solution': format_puzzle_line(flatten_grid(solution)) if as_line else solution,
+                        'unique': result['unique'],
+                        'cached': cached or False,
+                        'lookup_ms' if cached == 'exact' else 'solve_ms': round((time.perf_counter() - start) * 1000, 3),
+                    })
+                    if render:
+                        line['image'] = result['image']
+            except (ValueError, TypeError) as e:
+                line.update({'success': False, 'error': str(e)})
+            yield json.dumps(line) + '\n'
     
-    # Check 3x3 box
-    start_row = 3 * (row // 3)
-    start_col = 3 * (col // 3)
-    for i in range(3):
-        for j in range(3):
-            if grid[i + start_row][j + start_col] == num:
-                return False
-    
-    return True
-
-def find_empty_cell(grid):
-    """Find an empty cell (cell with value 0)"""
-    for i in range(9):
-        for j in range(9):
-            if grid[i][j] == 0:
-                return (i, j)
-    return None
-
-def solve_sudoku_backtrack(grid):
-    """Solve the Sudoku puzzle using backtracking"""
-    empty_cell = find_empty_cell(grid)
-    
-    if not empty_cell:
-        return True
-    
-    row, col = empty_cell
-    
-    for num in range(1, 10):
-        if is_valid(grid, row, col, num):
-            grid[row, col] = num
-            if solve_sudoku_backtrack(grid):
-                return True
-            grid[row, col] = 0
-    
-    return False
-
-def save_sudoku_to_csv(grid, csv_file):
-    """Save Sudoku grid to CSV file"""
-    with open(csv_file, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        for row in grid:
-            writer.writerow(row)
-
-def create_solution_image(grid):
-    """Create visual image of solved Sudoku"""
-    # Image parameters
-    cell_size = 60
-    margin = 30
-    line_thickness = 2
-    
-    # Calculate total image size
-    total_size = 9 * cell_size + 2 * margin
-    
-    # Create white background
-    image = np.ones((total_size, total_size, 3), dtype=np.uint8) * 255
-    
-    # Draw grid lines
-    for i in range(10):
-        x = margin + i * cell_size
-        thickness = line_thickness * 2 if i % 3 == 0 else line_thickness
-        cv2.line(image, (x, margin), (x, total_size - margin), (0, 0, 0), thickness)
-        
-        y = margin + i * cell_size
-        cv2.line(image, (margin, y), (total_size - margin, y), (0, 0, 0), thickness)
+    return Response(stream(), mimetype='application/x-ndjson')
+
+@app.route('/solve/image/<puzzle>/<solution>.<any(png, webp, svg):image_format>', methods=['GET'])
+def solution_image(puzzle, solution, image_format):
+    """Rendered solution; the URL holds both grids, so responses are cached for good"""
+    try:
+        data = encoded_solution_image(puzzle, solution, image_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    return Response(data, mimetype=IMAGE_FORMATS[image_format], headers={
+        'Cache-Control': f'public, max-age={IMAGE_MAX_AGE}, immutable',
+    })
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events: one 'stage' event per change, then 'done' or 'failed'"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if not event_streams.acquire(blocking=False):
+        response = jsonify({'error': 'Too many open event streams, poll the status URL instead'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
     
-    # Add numbers
-    font = cv2.FONT_HERSHEY_SIMPLEX
-    font_scale = 1.2
-    font_thickness = 2
+    def stream():
+        version = -1
+        while True:
+            seen = job_queue.wait(job, version, timeout=15.0)
+            if seen == version:
+                yield ': keep-alive\n\n'
+                continue
+            version = seen
+            data = job.to_dict()
+            event = data['state'] if data['state'] in (DONE, FAILED) else 'stage'
+            yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+            if event != 'stage':
+                return
     
-    for row in range(9):
-        for col in range(9):
-            x = margin + col * cell_size + cell_size // 2
-            y = margin + row * cell_size + cell_size // 2 + 10
+    response = Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    # Runs when the server closes the response, also if the client went away early
+    response.call_on_close(event_streams.release)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage latency histograms, solver effort and request counters in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        'exact': solution_cache.stats(),
+        'symmetry': symmetry_cache.stats(),
+        'ocr': ocr_cache.stats(),
+        'jobs': job_queue.stats(),
+    })
+
+# Puzzle rendered and detected once by warm_up()
+WARM_UP_PUZZLE = '530070000600195000098000060800060003400803001700020006060000280000419005000080079'
+
+def warm_up():
+    """Run one detect and one solve so imports, prototypes, glyph atlases and solver tables are loaded up front; returns ms"""
+    from sudoku_to_csv import detect_sudoku
+    start = time.perf_counter()
+    puzzle = parse_puzzle_line(WARM_UP_PUZZLE)
+    photo = render_bytes(puzzle, None, 'png', WEB_STYLE)
+    # No OCR cache and a single OCR thread: this may run in a parent process
+    # before fork, where a started thread pool would not survive
+    detect_sudoku(photo, find_tesseract_cmd(), OCR_MODE, None, 1)
+    solve_grid(line_to_grid(WARM_UP_PUZZLE))
+    return (time.perf_counter() - start) * 1000
+
+def run_sudoku_detection(image_bytes):
+    """Run Sudoku detection in memory on encoded image bytes"""
+    from sudoku_to_csv import detect_sudoku
+    try:
+        grid, status, ink_ratio, _ = detect_sudoku(
+            image_bytes, find_tesseract_cmd(), OCR_MODE, ocr_cache, OCR_THREADS
+        )
+        if SAVE_CSV_OUTPUTS:
+            save_sudoku_to_csv(grid, 'sudoku_grid.csv')
+            write_cells_csv(grid, status, ink_ratio, 'sudoku_cells.csv')
+        return {'success': True, 'grid': grid}
             
-            number = grid[row][col]
-            if number != 0:
-                text = str(number)
-                (text_width, text_height), baseline = cv2.getTextSize(text, font, font_scale, font_thickness)
-                x = x - text_width // 2
-                y = y + text_height // 2
-                cv2.putText(image, text, (x, y), font, font_scale, (0, 0, 0), font_thickness)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+def run_upload_job(image_bytes, method, report):
+    """Background job: detect the grid, then solve it, reporting each stage"""
+    from sudoku_to_csv import detect_sudoku
+    grid, _, _, _ = detect_sudoku(
+        image_bytes, find_tesseract_cmd(), OCR_MODE, ocr_cache, OCR_THREADS, on_stage=report
+    )
+    report('solve')
+    result, cached = solve_grid(grid, method)
+    return {
+        'grid': grid.tolist(),
+        'solution': result['solution'] if result else None,
+        'image': result['image'] if result else None,
+        'unique': result['unique'] if result else None,
+        'cached': cached or False,
+        'solver': method,
+    }
+
+def solve_grid(grid, method=DEFAULT_SOLVER, render=True):
+    """Solve through the solution caches; returns (result or None, 'exact', 'symmetry' or None)"""
+    cells = flatten_grid(grid)
+    exact_key = grid_key(cells, method)
+    result = solution_cache.get(exact_key)
+    cached = 'exact' if result is not None else None
+    if result is None:
+        # Asking for a second solution doubles as a uniqueness check. A search that passes
+        # SYMMETRY_MIN_NODES first looks for a symmetric copy solved before, then carries on
+        symmetry = None
+
+        def look_up_symmetric():
+            nonlocal symmetry
+            symmetry = symmetry_lookup(cells)
+            if symmetry[2] is not None:
+                raise SearchBudgetExceeded('solved as a symmetric copy')
+
+        stats = SearchStats(SYMMETRY_MIN_NODES.get(method), look_up_symmetric)
+        with timed('solve'):
+            try:
+                found = find_solutions(cells, 2, method, stats)
+            except SearchBudgetExceeded:
+                found, cached = [symmetry[1].invert(symmetry[2]['solution'])], 'symmetry'
+        if symmetry is not None and cached is None and len(found) == 1:
+            symmetry_cache.put(symmetry[0], {'solution': symmetry[1].apply(found[0])})
+        SOLVER_NODES.inc(stats.nodes, solver=method)
+        SOLVER_BACKTRACKS.inc(stats.backtracks, solver=method)
+        SOLVE_NODES.observe(stats.nodes, solver=method)
+        SOLVE_LOOKUPS.inc(tier=cached or 'miss')
+        if not found:
+            return None, None
+        solved = found[0]
+        result = {'solution': [solved[r * 9:(r + 1) * 9] for r in range(9)], 'unique': len(found) == 1}
+        if not render:
+            solution_cache.put(exact_key, result)
+    else:
+        SOLVE_LOOKUPS.inc(tier=cached)
+    if not render:
+        return {'solution': result['solution'], 'unique': result['unique']}, cached
     
-    return image
+    # Entries stored by image-less requests get their image on the first request that wants one
+    if 'image' not in result:
+        # Render the solution image and convert to base64 for display
+        with timed('render'):
+            image = render_image(result['solution'], cells, 'png', WEB_STYLE)
+        with timed('encode'):
+            image = base64.b64encode(encode_image(image, 'png', WEB_STYLE)).decode('utf-8')
+        result = dict(result, image=image)
+        solution_cache.put(exact_key, result)
+    return result, cached
+
+def symmetry_lookup(cells):
+    """Canonicalize a puzzle; returns (symmetry cache key, Transform, cached entry or None)"""
+    with timed('canonicalize'):
+        canonical, transform = canonicalize(cells)
+    # Only unique solutions are stored, and every backend agrees on those, so the key has no method
+    key = grid_key(canonical, 'unique')
+    return key, transform, symmetry_cache.get(key)
+
+def solution_image_url(puzzle_cells, solution_cells, image_format):
+    """Path of the GET /solve/image resource for a solved puzzle"""
+    return f'/solve/image/{format_puzzle_line(puzzle_cells)}/{format_puzzle_line(solution_cells)}.{image_format}'
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def encoded_solution_image(puzzle, solution, image_format):
+    """Render and encode a solution image; raises ValueError unless `solution` validly solves `puzzle`"""
+    puzzle_cells = parse_puzzle_line(puzzle)
+    solution_cells = parse_puzzle_line(solution)
+    if not is_solution(puzzle_cells, solution_cells):
+        raise ValueError('Solution does not solve the puzzle')
+    with timed('render'):
+        image = render_image(solution_cells, puzzle_cells, image_format, WEB_STYLE)
+    with timed('encode'):
+        return encode_image(image, image_format, WEB_STYLE)
+
+def parse_batch_puzzle(item):
+    """One /solve/batch entry (81-char string, 9x9 or flat list, or {"id", "grid"}) -> (id, 81 cells, as_line)"""
+    puzzle_id = None
+    if isinstance(item, dict):
+        puzzle_id = item.get('id')
+        item = item.get('grid')
+    if isinstance(item, str):
+        return puzzle_id, parse_puzzle_line(item), True
+    if not isinstance(item, list):
+        raise ValueError('Expected an 81-character string, a 9x9 list or {"grid": ...}')
+    cells = flatten_grid(item) if len(item) == 9 and all(isinstance(row, list) for row in item) else item
+    if len(cells) != 81 or not all(isinstance(v, int) and 0 <= v <= 9 for v in cells):
+        raise ValueError('Expected 81 cells with values 0-9')
+    return puzzle_id, [int(v) for v in cells], False
 
 if __name__ == '__main__':
     # Get port from environment variable (for production)
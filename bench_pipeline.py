@@ -0,0 +1,292 @@
+# bench_pipeline.py
+"""
+End-to-end detection benchmark on synthetic puzzle photos.
+
+Puzzles from the bench_puzzles/ corpora are drawn with the renderer behind
+create_solution_only.py, placed on a page at several resolutions and put
+through seeded camera-like distortions (rotation, perspective warp, blur,
+sensor noise, uneven lighting). Each image is written to disk and read back
+by sudoku_to_csv.process_image_to_csv, so the run covers the same path as the
+CLI. Per resolution and distortion it reports median / p99 wall time,
+images per second, the median of every timed pipeline stage, and how many
+given digits and blanks were read correctly against the puzzle that was
+drawn. Results are written as JSON; --compare flags slowdowns and accuracy
+drops against an earlier report.
+
+Runs fully offline (the knn recognizer needs no Tesseract):
+
+    python bench_pipeline.py --out pipeline.json
+    python bench_pipeline.py --compare pipeline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from bench_solvers import CORPORA, git_commit, load_corpus, percentile
+from create_solution_only import create_sudoku_solution_image
+from metrics import collect_timings, finish_timings
+from sudoku_core import read_sudoku_from_csv
+from sudoku_core.ocr import OCR_MODES, default_ocr_mode
+from sudoku_to_csv import process_image_to_csv
+
+RESOLUTIONS = (480, 800, 1280, 2048)  # long side of the photo (px)
+PAGE_COLOR = (228, 232, 236)          # BGR, off-white paper around the printed grid
+
+# Distortion strengths; each image draws its own parameters up to these
+DISTORTIONS: Dict[str, Dict[str, float]] = {
+    "clean": {},
+    "rotate": {"rotate": 12.0},             # degrees either way
+    "perspective": {"perspective": 0.08},   # corner shift, fraction of the side
+    "blur": {"blur": 2.0},                  # Gaussian sigma at 1000 px
+    "noise": {"noise": 14.0},               # Gaussian sigma, grey levels
+    "lighting": {"lighting": 0.55},         # darkest corner falls to 1 - this
+    "combined": {"rotate": 6.0, "perspective": 0.05, "blur": 1.2, "noise": 8.0, "lighting": 0.35},
+}
+
+
+# -------------------- Synthetic photos --------------------
+def place_on_page(board: np.ndarray, size: int, fill: float = 0.8) -> np.ndarray:
+    """Scale the rendered board so it spans `fill` of a size x size page and centre it."""
+    h, w = board.shape[:2]
+    scale = fill * size / max(h, w)
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    board = cv2.resize(board, (round(w * scale), round(h * scale)), interpolation=interpolation)
+    page = np.full((size, size, 3), PAGE_COLOR, dtype=np.uint8)
+    y, x = (size - board.shape[0]) // 2, (size - board.shape[1]) // 2
+    page[y:y + board.shape[0], x:x + board.shape[1]] = board
+    return page
+
+
+def distort(image: np.ndarray, params: Dict[str, float], rng: np.random.Generator) -> np.ndarray:
+    """
+    Apply camera-like distortions in capture order: geometry, lighting, optics, sensor
+
+    Args:
+        image: BGR page
+        params: Strengths by name (see DISTORTIONS); missing names are skipped
+        rng: Random source for the per-image parameters
+
+    Returns:
+        numpy array: Distorted BGR image of the same size
+    """
+    h, w = image.shape[:2]
+    out = image
+    if params.get("rotate"):
+        angle = rng.uniform(-1, 1) * params["rotate"]
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        out = cv2.warpAffine(out, matrix, (w, h), flags=cv2.INTER_LINEAR, borderValue=PAGE_COLOR)
+    if params.get("perspective"):
+        src = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+        dst = src + rng.uniform(-1, 1, size=(4, 2)).astype(np.float32) * params["perspective"] * np.float32([w, h])
+        matrix = cv2.getPerspectiveTransform(src, dst)
+        out = cv2.warpPerspective(out, matrix, (w, h), flags=cv2.INTER_LINEAR, borderValue=PAGE_COLOR)
+    if params.get("lighting"):
+        # Linear falloff along a random direction, brightest at one edge
+        theta = rng.uniform(0, 2 * np.pi)
+        yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+        ramp = np.cos(theta) * xx / w + np.sin(theta) * yy / h
+        ramp = (ramp - ramp.min()) / max(float(ramp.max() - ramp.min()), 1e-6)
+        gain = 1.0 - params["lighting"] * ramp
+        out = (out.astype(np.float32) * gain[..., None]).clip(0, 255).astype(np.uint8)
+    if params.get("blur"):
+        sigma = params["blur"] * rng.uniform(0.5, 1.0) * max(h, w) / 1000
+        out = cv2.GaussianBlur(out, (0, 0), sigma)
+    if params.get("noise"):
+        noise = rng.normal(0, params["noise"], size=out.shape)
+        out = (out.astype(np.float32) + noise).clip(0, 255).astype(np.uint8)
+    return out
+
+
+def synthetic_photo(cells: List[int], size: int, params: Dict[str, float], rng: np.random.Generator) -> np.ndarray:
+    """Render a puzzle (givens only) and turn it into a distorted size x size photo."""
+    grid = [cells[r * 9:(r + 1) * 9] for r in range(9)]
+    return distort(place_on_page(create_sudoku_solution_image(grid), size), params, rng)
+
+
+# -------------------- Measurement --------------------
+def score(truth: List[int], detected: List[List[int]]) -> Dict[str, int]:
+    """Cell-level agreement of a detected grid with the puzzle that was drawn."""
+    read = [int(v) for row in detected for v in row]
+    if len(read) != 81:
+        read = [0] * 81
+    givens = [(t, d) for t, d in zip(truth, read) if t]
+    blanks = [d for t, d in zip(truth, read) if not t]
+    return {
+        "digits": len(givens),
+        "digits_correct": sum(t == d for t, d in givens),
+        "blanks": len(blanks),
+        "blanks_correct": sum(d == 0 for d in blanks),
+    }
+
+
+def run_image(path: str, truth: List[int], workdir: str, ocr_mode: str, tesseract_cmd: Optional[str]) -> Dict:
+    """Detect one image through process_image_to_csv; timings in seconds plus the accuracy counts."""
+    grid_csv = os.path.join(workdir, "grid.csv")
+    cells_csv = os.path.join(workdir, "cells.csv")
+    token = collect_timings()
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_image_to_csv(path, grid_csv, cells_csv, tesseract_cmd=tesseract_cmd, ocr_mode=ocr_mode)
+    except Exception as e:  # a grid that cannot be located counts as a miss, not a crash
+        error = str(e)
+    total = time.perf_counter() - start
+    stages = finish_timings(token)
+    detected = read_sudoku_from_csv(grid_csv) if error is None else []
+    return {"total": total, "stages": stages, "error": error, **score(truth, detected)}
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    """Aggregate the runs of one resolution / distortion pair."""
+    totals = [r["total"] for r in runs]
+    stage_names = sorted({s for r in runs for s in r["stages"]})
+    digits = sum(r["digits"] for r in runs)
+    blanks = sum(r["blanks"] for r in runs)
+    return {
+        "images": len(runs),
+        "errors": sum(r["error"] is not None for r in runs),
+        "median_ms": statistics.median(totals) * 1000,
+        "p99_ms": percentile(totals, 99) * 1000,
+        "images_per_s": len(runs) / sum(totals),
+        "stages_median_ms": {
+            s: statistics.median(r["stages"].get(s, 0.0) for r in runs) * 1000 for s in stage_names
+        },
+        "digit_accuracy": sum(r["digits_correct"] for r in runs) / digits if digits else None,
+        "blank_accuracy": sum(r["blanks_correct"] for r in runs) / blanks if blanks else None,
+        "grids_exact": sum(
+            r["error"] is None and r["digits_correct"] == r["digits"] and r["blanks_correct"] == r["blanks"]
+            for r in runs
+        ),
+    }
+
+
+def run(args) -> Dict:
+    """Generate, detect and score every puzzle at every resolution and distortion; returns the JSON report."""
+    puzzles = [cells for name in args.corpus for cells in load_corpus(name)[:args.puzzles]]
+    ocr_mode = args.ocr_mode or default_ocr_mode(args.tesseract)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        image_dir = args.keep_images or workdir
+        os.makedirs(image_dir, exist_ok=True)
+        for size in args.resolution:
+            for name in args.distortion:
+                runs = []
+                for i, cells in enumerate(puzzles):
+                    # Seeded per image, so a subset run sees the same photos as a full one
+                    rng = np.random.default_rng([args.seed, size, list(DISTORTIONS).index(name), i])
+                    path = os.path.join(image_dir, f"{size}_{name}_{i}.png")
+                    cv2.imwrite(path, synthetic_photo(cells, size, DISTORTIONS[name], rng))
+                    runs.append(run_image(path, cells, workdir, ocr_mode, args.tesseract))
+                results.append({"resolution": size, "distortion": name, **summarize(runs)})
+                print_result(results[-1])
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "ocr_mode": ocr_mode,
+            "corpus": args.corpus,
+            "puzzles": len(puzzles),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+# -------------------- Reporting --------------------
+def _pct(value: Optional[float]) -> str:
+    return "   n/a" if value is None else f"{value * 100:5.1f}%"
+
+
+def print_result(r: Dict) -> None:
+    stages = " ".join(f"{s} {ms:.1f}" for s, ms in r["stages_median_ms"].items())
+    errors = f"  ❌ {r['errors']} not found" if r["errors"] else ""
+    print(f"{r['resolution']:>5}px {r['distortion']:<11} n={r['images']:<3} "
+          f"median {r['median_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms  {r['images_per_s']:5.1f}/s  "
+          f"digits {_pct(r['digit_accuracy'])}  blanks {_pct(r['blank_accuracy'])}  "
+          f"exact {r['grids_exact']}/{r['images']}{errors}  [{stages} ms]")
+
+
+def compare(report: Dict, baseline: Dict, threshold: float, accuracy_drop: float) -> List[str]:
+    """Lines describing resolution/distortion pairs that got slower or less accurate than baseline."""
+    before = {(r["resolution"], r["distortion"]): r for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        old = before.get((r["resolution"], r["distortion"]))
+        if old is None or old["images"] != r["images"]:
+            continue  # not run, or run with a different --puzzles / --corpus
+        label = f"{r['resolution']}px / {r['distortion']}"
+        for key in ("median_ms", "p99_ms"):
+            if old[key] > 0 and r[key] > old[key] * (1 + threshold):
+                regressions.append(f"{label}: {key} {old[key]:.1f} -> {r[key]:.1f} "
+                                   f"(+{(r[key] / old[key] - 1) * 100:.0f}%)")
+        for key in ("digit_accuracy", "blank_accuracy"):
+            if old[key] is not None and r[key] is not None and r[key] < old[key] - accuracy_drop:
+                regressions.append(f"{label}: {key} {_pct(old[key]).strip()} -> {_pct(r[key]).strip()}")
+    return regressions
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Benchmark image detection on synthetic Sudoku photos.")
+    ap.add_argument("--corpus", action="append", default=None, choices=sorted(CORPORA),
+                    help="Puzzle corpus to draw (repeatable). Default: easy and 17-clue.")
+    ap.add_argument("--puzzles", type=int, default=4, help="Puzzles taken from each corpus.")
+    ap.add_argument("--resolution", action="append", type=int, default=None,
+                    help=f"Photo size in px (repeatable). Default: {', '.join(map(str, RESOLUTIONS))}.")
+    ap.add_argument("--distortion", action="append", default=None, choices=list(DISTORTIONS),
+                    help="Distortion preset (repeatable). Default: all.")
+    ap.add_argument("--seed", type=int, default=0, help="Seed for the distortion parameters.")
+    ap.add_argument("--ocr-mode", default=None, choices=OCR_MODES,
+                    help="Recognizer to benchmark. Default: cell if Tesseract is found, else knn.")
+    ap.add_argument("--tesseract", default=None, help="Path to tesseract executable (if not on PATH).")
+    ap.add_argument("--keep-images", default=None, help="Keep the generated photos in this directory.")
+    ap.add_argument("--out", default=None, help="Write the JSON report to this file.")
+    ap.add_argument("--compare", default=None, help="Baseline JSON report to check for regressions.")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="Slowdown (fraction) of median or p99 that counts as a regression.")
+    ap.add_argument("--accuracy-drop", type=float, default=0.01,
+                    help="Fall in digit or blank accuracy that counts as a regression.")
+    args = ap.parse_args()
+    args.corpus = args.corpus or ["easy", "17-clue"]
+    args.resolution = args.resolution or list(RESOLUTIONS)
+    args.distortion = args.distortion or list(DISTORTIONS)
+    return args
+
+
+def main():
+    args = parse_args()
+    report = run(args)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold, args.accuracy_drop)
+        for line in regressions:
+            print(f"⚠️  Regression: {line}")
+        if not regressions:
+            print(f"✅ No regressions against {args.compare}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# bench_solvers.py
+"""
+Solver benchmark over the bundled puzzle corpora in bench_puzzles/.
+
+Every backend in sudoku_core.SOLVERS (or any `module:function` with the same
+signature: 81 cells in, 81 cells or None out) solves every puzzle of every
+corpus. Solvers with the older in-place API (a 9x9 grid filled in place, True
+if solved), such as solve_sudoku.solve_sudoku or a plain backtracker, run as
+`grid:module:function`. Per backend and corpus it reports median / p99 / max
+time per puzzle, puzzles per second, search nodes and backtracks (for solvers
+that accept a SearchStats), and the peak Python heap of a solve. Each corpus
+can be grown with random symmetry variants of its puzzles, which keep the
+difficulty but change the cell and digit order a search sees. Results are
+written as JSON, and a previous JSON can be passed with --compare to flag
+regressions.
+
+Runs fully offline:
+
+    python bench_solvers.py --out bench.json
+    python bench_solvers.py --compare bench.json
+    python bench_solvers.py --solver grid:solve_sudoku:solve_sudoku
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sudoku_core import SOLVERS, SearchStats, is_solution, parse_puzzle_line, read_puzzle_lines
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_puzzles")
+# name -> (file, whether random variants are allowed; relabeling digits would
+# undo what makes the anti-naive puzzles adversarial)
+CORPORA = {
+    "easy": ("easy.txt", True),
+    "hard": ("hard.txt", True),
+    "17-clue": ("seventeen.txt", True),
+    "anti-naive": ("anti_naive.txt", False),
+}
+Solver = Callable[..., Optional[List[int]]]
+
+
+# -------------------- Corpora --------------------
+def load_corpus(name: str) -> List[List[int]]:
+    """Read one bundled corpus as a list of 81-cell puzzles."""
+    filename, _ = CORPORA[name]
+    with open(os.path.join(CORPUS_DIR, filename), "r", encoding="utf-8") as f:
+        return [parse_puzzle_line(line) for line in read_puzzle_lines(f)]
+
+
+def random_variant(cells: Sequence[int], rng: random.Random) -> List[int]:
+    """Apply a random validity-preserving symmetry (transpose, band/row/stack/column swaps, relabel)."""
+    def order() -> List[int]:
+        bands = rng.sample(range(3), 3)
+        return [b * 3 + i for b in bands for i in rng.sample(range(3), 3)]
+
+    rows, cols = order(), order()
+    relabel = [0] + rng.sample(range(1, 10), 9)
+    grid = [cells[r * 9 + c] for r in rows for c in cols]
+    if rng.random() < 0.5:
+        grid = [grid[c * 9 + r] for r in range(9) for c in range(9)]
+    return [relabel[v] for v in grid]
+
+
+def expand_corpus(puzzles: List[List[int]], variants: int, seed: int) -> List[List[int]]:
+    """Each puzzle followed by `variants` random symmetric copies (deterministic for a seed)."""
+    rng = random.Random(seed)
+    expanded = []
+    for cells in puzzles:
+        expanded.append(cells)
+        expanded.extend(random_variant(cells, rng) for _ in range(variants))
+    return expanded
+
+
+# -------------------- Solvers --------------------
+def in_place_solver(solve_grid: Callable[[List[List[int]]], bool]) -> Solver:
+    """Adapt a solver that fills a 9x9 grid in place and returns True if solved."""
+    def solve(cells: Sequence[int]) -> Optional[List[int]]:
+        grid = [list(cells[r * 9:(r + 1) * 9]) for r in range(9)]
+        return [v for row in grid for v in row] if solve_grid(grid) else None
+    return solve
+
+
+def resolve_solver(spec: str) -> Solver:
+    """A backend name from SOLVERS, a `module:function` import path, or `grid:module:function` for in-place solvers."""
+    if spec in SOLVERS:
+        return SOLVERS[spec]
+    in_place = spec.startswith("grid:")
+    module_name, _, attr = spec[len("grid:"):].partition(":") if in_place else spec.partition(":")
+    if not attr:
+        raise ValueError(f"Unknown solver '{spec}'. Use one of {', '.join(sorted(SOLVERS))}, "
+                         "module:function or grid:module:function")
+    solver = getattr(importlib.import_module(module_name), attr)
+    return in_place_solver(solver) if in_place else solver
+
+
+def accepts_stats(solver: Solver) -> bool:
+    try:
+        return "stats" in inspect.signature(solver).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+# -------------------- Measurement --------------------
+def git_commit() -> Optional[str]:
+    """Short hash of the checked-out commit, if this is a git checkout."""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(CORPUS_DIR),
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def bench_corpus(solver: Solver, puzzles: List[List[int]], repeat: int = 3, memory: bool = True) -> Dict:
+    """
+    Time one solver over one corpus
+
+    Args:
+        solver: Callable taking 81 cells (and optionally stats=SearchStats)
+        puzzles: Puzzles to solve
+        repeat: Timed solves per puzzle; the fastest counts
+        memory: Also run a tracemalloc pass for the peak heap per solve
+
+    Returns:
+        dict: Summary statistics for the corpus
+    """
+    with_stats = accepts_stats(solver)
+    solver(puzzles[0])  # warm lazily built tables (e.g. the DLX matrix)
+
+    times, nodes, backtracks = [], [], []
+    failures = 0
+    for cells in puzzles:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            solution = solver(list(cells))
+            best = min(best, time.perf_counter() - start)
+        times.append(best)
+        if not is_solution(cells, solution):
+            failures += 1
+        if with_stats:
+            stats = SearchStats()
+            solver(list(cells), stats=stats)
+            nodes.append(stats.nodes)
+            backtracks.append(stats.backtracks)
+
+    peak = None
+    if memory:
+        # Separate pass: tracemalloc slows allocation down too much to time under it
+        tracemalloc.start()
+        peak = 0
+        for cells in puzzles:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            solver(list(cells))
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+
+    total = sum(times)
+    result = {
+        "puzzles": len(puzzles),
+        "failures": failures,
+        "median_ms": statistics.median(times) * 1000,
+        "p99_ms": percentile(times, 99) * 1000,
+        "max_ms": max(times) * 1000,
+        "puzzles_per_s": len(puzzles) / total if total > 0 else float("inf"),
+        "peak_kib": None if peak is None else peak / 1024,
+    }
+    if nodes:
+        result.update({
+            "nodes_median": statistics.median(nodes),
+            "nodes_max": max(nodes),
+            "nodes_total": sum(nodes),
+            "backtracks_total": sum(backtracks),
+        })
+    return result
+
+
+def run(solvers: List[str], corpora: List[str], variants: int, seed: int, repeat: int, memory: bool) -> Dict:
+    """Benchmark every solver on every corpus; returns the JSON report."""
+    results = []
+    for corpus in corpora:
+        puzzles = load_corpus(corpus)
+        if CORPORA[corpus][1]:
+            puzzles = expand_corpus(puzzles, variants, seed)
+        for spec in solvers:
+            summary = bench_corpus(resolve_solver(spec), puzzles, repeat, memory)
+            results.append({"solver": spec, "corpus": corpus, **summary})
+            print_result(results[-1])
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "variants": variants,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# -------------------- Reporting --------------------
+def print_result(r: Dict) -> None:
+    nodes = f"  nodes med {r['nodes_median']:g} max {r['nodes_max']}" if "nodes_median" in r else ""
+    peak = f"  peak {r['peak_kib']:.1f} KiB" if r["peak_kib"] is not None else ""
+    failed = f"  ❌ {r['failures']} wrong" if r["failures"] else ""
+    print(f"{r['solver']:>10} {r['corpus']:<11} n={r['puzzles']:<5} "
+          f"median {r['median_ms']:8.3f} ms  p99 {r['p99_ms']:8.3f} ms  "
+          f"{r['puzzles_per_s']:9,.0f}/s{nodes}{peak}{failed}")
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Lines describing solver/corpus pairs whose median or p99 got slower than baseline by more than `threshold`."""
+    before = {(r["solver"], r["corpus"]): r for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        old = before.get((r["solver"], r["corpus"]))
+        if old is None or old["puzzles"] != r["puzzles"]:
+            continue  # not run, or run with a different --variants
+        for key in ("median_ms", "p99_ms"):
+            if old[key] > 0 and r[key] > old[key] * (1 + threshold):
+                regressions.append(
+                    f"{r['solver']} / {r['corpus']}: {key} {old[key]:.3f} -> {r[key]:.3f} "
+                    f"(+{(r[key] / old[key] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Benchmark Sudoku solver backends on the bundled corpora.")
+    ap.add_argument("--solver", action="append", default=None,
+                    help="Backend name, module:function, or grid:module:function for a solver that fills "
+                         "a 9x9 grid in place (repeatable). Default: every backend in SOLVERS.")
+    ap.add_argument("--corpus", action="append", default=None, choices=sorted(CORPORA),
+                    help="Corpus to run (repeatable). Default: all.")
+    ap.add_argument("--variants", type=int, default=9,
+                    help="Random symmetric copies added per puzzle (not for anti-naive).")
+    ap.add_argument("--seed", type=int, default=0, help="Seed for the symmetric copies.")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed solves per puzzle; the fastest counts.")
+    ap.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass.")
+    ap.add_argument("--out", default=None, help="Write the JSON report to this file.")
+    ap.add_argument("--compare", default=None, help="Baseline JSON report to check for regressions.")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="Slowdown (fraction) of median or p99 that counts as a regression.")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    solvers = args.solver or sorted(SOLVERS)
+    corpora = args.corpus or list(CORPORA)
+    report = run(solvers, corpora, args.variants, args.seed, args.repeat, not args.no_memory)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {args.out}")
+
+    failures = sum(r["failures"] for r in report["results"])
+    if failures:
+        print(f"❌ {failures} wrong or missing solutions")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"⚠️  Regression: {line}")
+        if not regressions:
+            print(f"✅ No regressions against {args.compare} (threshold {args.threshold:.0%})")
+        failures += len(regressions)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# digit_classifier.py
+"""
+Lightweight printed-digit classifier (k-nearest neighbours on 28x28 crops).
+
+Cells are binarized, cropped to their main ink blob and centered on a 28x28
+canvas. All cells of a grid are then compared against a small bundled set of
+prototypes with a single matrix product. No external binary is needed.
+The prototypes in digit_prototypes.npz are built by train_digit_classifier.py.
+"""
+import os
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+TILE_SIZE = 28
+DIGIT_BOX = 20  # the ink is scaled to fit this box, as in MNIST
+MIN_GLYPH_HEIGHT = 0.15  # blob height / cell height below which it is a speck, not a digit
+MIN_INK_CONTRAST = 0.25  # (paper - blob) / paper below which it is paper texture, not ink
+DEFAULT_PROTOTYPES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "digit_prototypes.npz")
+
+_prototypes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def normalize_digit(cell_gray: np.ndarray, size: int = TILE_SIZE) -> np.ndarray:
+    """
+    Binarize a cell and center its largest ink blob on a size x size canvas (white ink on black)
+
+    Otsu always finds two classes, so on a blank cell it turns paper texture
+    into "ink". A blob that is too short or too faint against the paper is
+    rejected before scaling and the canvas stays empty, which classifies as 0.
+    """
+    th = cv2.threshold(cell_gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+    canvas = np.zeros((size, size), dtype=np.uint8)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(th, connectivity=8)
+    if n <= 1:
+        return canvas
+
+    # Prefer blobs that do not touch the border (grid-line remnants usually do)
+    h, w = th.shape
+    x, y, bw, bh, area = stats[1:].T
+    inner = (x > 0) & (y > 0) & (x + bw < w) & (y + bh < h)
+    candidates = np.flatnonzero(inner) if inner.any() else np.arange(n - 1)
+    k = 1 + candidates[np.argmax(area[candidates])]
+    x, y, bw, bh = stats[k, :4]
+    blob = labels == k
+    paper = float(np.median(cell_gray[th == 0])) if (th == 0).any() else 0.0
+    if bh < MIN_GLYPH_HEIGHT * h or paper - cell_gray[blob].mean() < MIN_INK_CONTRAST * paper:
+        return canvas
+    crop = np.where(blob[y:y + bh, x:x + bw], 255, 0).astype(np.uint8)
+
+    box = DIGIT_BOX * size // TILE_SIZE
+    scale = box / max(bw, bh)
+    nw, nh = max(1, int(round(bw * scale))), max(1, int(round(bh * scale)))
+    crop = cv2.resize(crop, (nw, nh), interpolation=cv2.INTER_AREA)
+    y0, x0 = (size - nh) // 2, (size - nw) // 2
+    canvas[y0:y0 + nh, x0:x0 + nw] = crop
+    return canvas
+
+
+def digit_features(tiles: np.ndarray) -> np.ndarray:
+    """Blur (n, 28, 28) tiles with a 3x3 binomial kernel; return mean-centered, unit-length vectors."""
+    x = np.pad(tiles.astype(np.float32), ((0, 0), (1, 1), (1, 1)))
+    x = 0.25 * x[:, :-2] + 0.5 * x[:, 1:-1] + 0.25 * x[:, 2:]
+    x = 0.25 * x[:, :, :-2] + 0.5 * x[:, :, 1:-1] + 0.25 * x[:, :, 2:]
+    x = x.reshape(len(tiles), -1)
+    x -= x.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-6)
+
+
+def load_prototypes(path: str = DEFAULT_PROTOTYPES) -> Tuple[np.ndarray, np.ndarray]:
+    """Load (and memoize) prototype features and labels."""
+    if path not in _prototypes:
+        with np.load(path) as data:
+            _prototypes[path] = (digit_features(data["tiles"]), data["labels"].astype(np.int64))
+    return _prototypes[path]
+
+
+def classify_tiles(tiles: np.ndarray, k: int = 1, min_similarity: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Classify normalized tiles against the prototypes in one matrix product
+
+    Args:
+        tiles: (n, 28, 28) uint8 tiles from normalize_digit
+        k: Number of nearest prototypes that vote
+        min_similarity: Cosine similarity below which a tile is reported as 0 (unknown)
+
+    Returns:
+        tuple: (n,) predicted digits (0 = unknown) and (n,) best similarities
+    """
+    if len(tiles) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    protos, labels = load_prototypes()
+    sims = digit_features(tiles) @ protos.T                          # (n, P)
+    k = min(k, sims.shape[1])
+    nearest = np.argpartition(-sims, k - 1, axis=1)[:, :k]          # (n, k)
+    near_sims = np.take_along_axis(sims, nearest, axis=1)
+    votes = np.zeros((len(tiles), 10), dtype=np.float32)
+    np.add.at(votes, (np.arange(len(tiles))[:, None], labels[nearest]), near_sims)
+    digits = votes.argmax(axis=1)
+    best = near_sims.max(axis=1)
+    digits[best < min_similarity] = 0
+    return digits, best
+
+
+def classify_cells(cells: Dict[int, np.ndarray]) -> Dict[int, int]:
+    """Recognize a dict of cell crops keyed by cell index; 0 means not recognized."""
+    if not cells:
+        return {}
+    keys = list(cells)
+    tiles = np.stack([normalize_digit(cells[i]) for i in keys])
+    digits, _ = classify_tiles(tiles)
+    return {i: int(d) for i, d in zip(keys, digits)}
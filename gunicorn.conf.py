@@ -0,0 +1,82 @@
+# gunicorn.conf.py
+"""
+Production gunicorn settings for app.py.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported and warmed up once in the master (OpenCV, NumPy, the digit
+prototypes, glyph atlases and solver tables), then forked, so workers start
+hot and share those pages copy-on-write.
+
+Solving is pure Python and holds the GIL, so there is one worker per core
+(at least two), each with GUNICORN_THREADS threads for uploads waiting on
+Tesseract or OpenCV (both release the GIL), /jobs/<id>/events streams and
+streamed /solve/batch responses. Async job state (/upload?async=1) goes to a
+SQLite store in JOB_STORE_DIR, by default a directory of this master's own,
+so every worker can answer for every job and jobs outlive worker recycling.
+"""
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+CPUS = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, CPUS)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+# Recycle workers now and then so caches and fragmentation cannot grow without bound;
+# a lone worker is never recycled, as nothing would serve while it restarts
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000)) if workers > 1 else 0
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))  # large photos with per-cell Tesseract OCR
+graceful_timeout = 30
+keepalive = 5
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Async jobs shared by all workers (read when app.py is imported)
+DEFAULT_JOB_STORE = os.path.join(worker_tmp_dir or tempfile.gettempdir(), f"sudoku-jobs-{os.getpid()}")
+os.environ.setdefault("JOB_STORE_DIR", DEFAULT_JOB_STORE)
+
+# Cores per worker; caps the process-wide Tesseract pool (read when app.py is imported)
+CORES_PER_WORKER = max(1, CPUS // workers)
+os.environ.setdefault("OCR_MAX_THREADS", str(CORES_PER_WORKER))
+# Job event streams each hold a thread; leave the other half for ordinary requests
+os.environ.setdefault("JOB_EVENT_STREAMS", str(max(1, threads // 2)))
+
+
+def when_ready(server):
+    # preload_app has already imported app.py here, in the master
+    import app
+    from metrics import REGISTRY
+
+    # The final worker count, including a -w/--workers override; app.py refuses
+    # async uploads across several workers unless jobs are in a shared store
+    app.WORKER_PROCESSES = server.cfg.workers
+    try:
+        server.log.info("Warm-up (one detect, one solve) took %.0f ms", app.warm_up())
+    except Exception:
+        # Workers still serve; whatever failed loads on first use instead
+        server.log.exception("Warm-up failed")
+    # Warm-up requests are not traffic: start every worker's /metrics from zero
+    REGISTRY.reset()
+    # Move the warmed objects out of the collector's reach so GC passes in the
+    # workers do not touch (and copy) the pages they share with the master
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import cv2
+
+    cv2.setNumThreads(CORES_PER_WORKER)
+
+
+def on_exit(server):
+    # The default store only holds this run's jobs
+    if os.environ.get("JOB_STORE_DIR") == DEFAULT_JOB_STORE:
+        shutil.rmtree(DEFAULT_JOB_STORE, ignore_errors=True)
@@ -0,0 +1,211 @@
+# job_queue.py
+"""
+Small in-process job queue for the web app.
+
+Jobs run on a fixed pool of worker threads so a slow image no longer holds
+the HTTP request open. The number of queued plus running jobs is bounded
+(submit raises QueueFull beyond it), jobs report the stage they are in, and
+finished jobs are dropped once their result has been kept for `ttl` seconds.
+
+With a store directory, every job's state is also written to a SQLite file
+there, so any server process sharing the directory can answer for a job and
+the pending limit holds across all of them. Jobs still run in the process that
+accepted them; a job that has not finished `ttl` seconds after it was queued
+is taken to have been lost with its process and expires as well.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_pending unfinished jobs."""
+
+
+class Job:
+    """One queued unit of work and its progress."""
+
+    __slots__ = ("id", "state", "stage", "result", "error", "created", "finished", "version")
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.state = QUEUED
+        self.stage: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.version = 0  # bumped on every change, for event streams
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"id": self.id, "state": self.state, "stage": self.stage}
+        if self.state == DONE:
+            data["result"] = self.result
+        elif self.state == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """Bounded thread-pool job queue with stage reporting, result expiry and an optional shared store."""
+
+    POLL_INTERVAL = 0.2  # seconds between store reads while waiting on another process's job
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, ttl: float = 300.0, store_dir: Optional[str] = None):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending = 0
+        self._changed = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._db_path = None
+        self._db = None
+        self._db_pid = None
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+            self._db_path = os.path.join(store_dir, "jobs.sqlite3")
+
+    @property
+    def shared(self) -> bool:
+        """True when job state is kept in a store other processes can read."""
+        return self._db_path is not None
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the store lazily, once per process, so forked workers never share a handle."""
+        if self._db_path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            # Autocommit, so submit can take the write lock itself with BEGIN IMMEDIATE
+            self._db = sqlite3.connect(self._db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, state TEXT NOT NULL, stage TEXT,"
+                " result TEXT, error TEXT, created REAL NOT NULL, finished REAL, version INTEGER NOT NULL)"
+            )
+            self._db_pid = os.getpid()
+        return self._db
+
+    def submit(self, fn: Callable[[Callable[[str], None]], Any]) -> Job:
+        """Queue fn(report_stage); raises QueueFull when the queue is at capacity."""
+        with self._changed:
+            self._expire()
+            job = Job(uuid.uuid4().hex)
+            db = self._connection()
+            if db is None:
+                if self._pending >= self.max_pending:
+                    raise QueueFull(f"{self._pending} jobs pending")
+            else:
+                # Count and insert under the store's write lock so processes cannot overshoot together
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    pending = db.execute("SELECT COUNT(*) FROM jobs WHERE finished IS NULL").fetchone()[0]
+                    if pending >= self.max_pending:
+                        raise QueueFull(f"{pending} jobs pending")
+                    self._save(db, job)
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                db.execute("COMMIT")
+            self._jobs[job.id] = job
+            self._pending += 1
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job, or None if it is unknown or expired; jobs of other processes come back as snapshots."""
+        with self._changed:
+            self._expire()
+            job = self._jobs.get(job_id)
+            if job is None and self._db_path is not None:
+                job = self._load(job_id)
+            return job
+
+    def wait(self, job: Job, version: int, timeout: float) -> int:
+        """Block until the job changes past `version` (or timeout); returns its current version."""
+        with self._changed:
+            if self._jobs.get(job.id) is job or self._db_path is None:
+                self._changed.wait_for(lambda: job.version != version, timeout)
+                return job.version
+        # Another process runs it: re-read the snapshot from the store until it moves on
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._changed:
+                stored = self._load(job.id)
+            if stored is not None and stored.version != job.version:
+                for name in Job.__slots__:
+                    setattr(job, name, getattr(stored, name))
+            if job.version != version or time.monotonic() >= deadline:
+                return job.version
+            time.sleep(min(self.POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+
+    def _update(self, job: Job, **fields) -> None:
+        with self._changed:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.version += 1
+            if job.state in (DONE, FAILED) and job.finished is None:
+                job.finished = time.time()
+                self._pending -= 1
+            db = self._connection()
+            if db is not None:
+                self._save(db, job)
+            self._changed.notify_all()
+
+    @staticmethod
+    def _save(db: sqlite3.Connection, job: Job) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO jobs (id, state, stage, result, error, created, finished, version)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.state, job.stage, json.dumps(job.result), job.error, job.created, job.finished, job.version),
+        )
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        # Caller holds the lock
+        row = self._connection().execute(
+            "SELECT state, stage, result, error, created, finished, version FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = Job(job_id)
+        job.state, job.stage, result, job.error, job.created, job.finished, job.version = row
+        job.result = json.loads(result)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Callable[[str], None]], Any]) -> None:
+        self._update(job, state=RUNNING)
+        try:
+            result = fn(lambda stage: self._update(job, stage=stage))
+        except Exception as e:
+            self._update(job, state=FAILED, error=str(e))
+        else:
+            self._update(job, state=DONE, result=result)
+
+    def _expire(self) -> None:
+        # Finished jobs are dropped ttl seconds after completion; caller holds the lock
+        cutoff = time.time() - self.ttl
+        expired = [j.id for j in self._jobs.values() if j.finished is not None and j.finished < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        db = self._connection()
+        if db is not None:
+            db.execute("DELETE FROM jobs WHERE finished < ? OR (finished IS NULL AND created < ?)", (cutoff, cutoff))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._changed:
+            self._expire()
+            db = self._connection()
+            if db is None:
+                return {"jobs": len(self._jobs), "pending": self._pending, "max_pending": self.max_pending, "shared": False}
+            jobs, pending = db.execute("SELECT COUNT(*), COUNT(*) - COUNT(finished) FROM jobs").fetchone()
+            return {"jobs": jobs, "pending": pending, "max_pending": self.max_pending, "shared": True}
@@ -0,0 +1,118 @@
+# ocr_cache.py
+"""
+Cache of OCR results for repeated uploads of the same puzzle picture.
+
+A warped grid is fingerprinted by which cells hold ink and the digit the
+built-in k-NN classifier reads in each of them; that key selects candidate
+entries exactly. A candidate is confirmed by comparing every filled cell's
+ink map at the warped resolution, centred on its ink and contrast-normalized,
+so a re-encoded, relit or mildly rescaled copy of a picture hits while a grid
+with one different digit misses. Entries live in a bounded LRU.
+"""
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+INK_BLUR = 1.5        # Gaussian sigma (px) applied to the ink maps before comparing
+MAX_CELL_DIFF = 36.0  # summed |difference| allowed in any filled cell, in fully inked pixels
+
+
+class Fingerprint(NamedTuple):
+    key: bytes       # filled-cell mask and k-NN digits, 81 bytes
+    ink: np.ndarray  # (filled cells, h, w) float32 ink maps, 0 = paper, 1 = ink
+
+
+def fingerprint(cells: np.ndarray, ink_thresh: float, filled: np.ndarray, digits: np.ndarray) -> Fingerprint:
+    """
+    Fingerprint a warped grid from its cells
+
+    Args:
+        cells: (9, 9, h, w) grayscale cell interiors (see sudoku_to_csv.split_into_cells)
+        ink_thresh: Gray level at or below which a pixel is ink
+        filled: (9, 9) bool, cells that hold ink
+        digits: (9, 9) k-NN digits of the filled cells (0 elsewhere)
+
+    Returns:
+        Fingerprint: exact bucket key and per-cell ink maps
+    """
+    import cv2  # the cache itself is created at app start-up, before any image work
+
+    key = np.where(filled, np.asarray(digits) + 1, 0).astype(np.uint8).tobytes()
+    h, w = cells.shape[2:]
+    x = cells[filled].astype(np.float32)                          # (n, h, w)
+    ink = x <= ink_thresh
+    n_ink = ink.sum(axis=(1, 2))
+    # Ink pixels are exactly the darkest ones, so both levels are ranks in the sorted cell:
+    # the paper is the median of the rest, the ink level the 10th percentile of the ink
+    ranked = np.sort(x.reshape(len(x), -1), axis=1)
+    rows = np.arange(len(x))
+    paper = ranked[rows, np.minimum(n_ink + (h * w - n_ink) // 2, h * w - 1)]
+    dark = ranked[rows, (np.maximum(n_ink - 1, 0) // 10)]
+    # Paper at 0, the darkest ink at 1, so exposure and lighting cancel out
+    level = np.clip((paper[:, None, None] - x) / np.maximum(paper - dark, 1.0)[:, None, None], 0.0, 1.0)
+    area = np.maximum(n_ink, 1)
+    cy = (ink.sum(axis=2) * np.arange(h)).sum(axis=1) / area
+    cx = (ink.sum(axis=1) * np.arange(w)).sum(axis=1) / area
+    maps = np.empty_like(level)
+    for k in range(len(x)):
+        shift = (int(round(h / 2 - cy[k])), int(round(w / 2 - cx[k])))
+        maps[k] = cv2.GaussianBlur(np.roll(level[k], shift, axis=(0, 1)), (0, 0), INK_BLUR)
+    return Fingerprint(key, maps)
+
+
+def max_cell_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Largest per-cell summed absolute difference between two sets of ink maps, allowing a 1 px shift."""
+    if a.shape != b.shape:
+        return float("inf")
+    if len(a) == 0:
+        return 0.0
+    best = None
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            diff = np.abs(a - np.roll(b, (dy, dx), axis=(1, 2))).sum(axis=(1, 2))
+            best = diff if best is None else np.minimum(best, diff)
+    return float(best.max())
+
+
+class OcrCache:
+    """Thread-safe LRU of detection results keyed by grid fingerprint."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[str, Fingerprint, Any]]" = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def get(self, fp: Fingerprint, tag: str = "") -> Optional[Any]:
+        """Return the value cached for a matching fingerprint with the same tag, or None."""
+        with self._lock:
+            for k in reversed(self._entries):
+                t, cached, value = self._entries[k]
+                if t == tag and cached.key == fp.key and max_cell_difference(cached.ink, fp.ink) <= MAX_CELL_DIFF:
+                    self._entries.move_to_end(k)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, fp: Fingerprint, value: Any, tag: str = "") -> None:
+        with self._lock:
+            self._entries[next(self._ids)] = (tag, fp, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
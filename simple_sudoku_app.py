@@ -1,12 +1,14 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import subprocess
 import os
-import csv
-import numpy as np
 import cv2
 from PIL import Image, ImageTk
 
+from sudoku_core import save_comparison_csv, save_sudoku_to_csv, solve_in_place, write_cells_csv
+from sudoku_core.ocr import default_ocr_mode, find_tesseract_cmd
+from sudoku_core.render import WEB_STYLE, render_grid
+from sudoku_to_csv import detect_sudoku
+
 class SimpleSudokuApp:
     def __init__(self, root):
         self.root = root
@@ -134,8 +136,8 @@ class SimpleSudokuApp:
     
     def display_solution_image(self, grid):
         try:
-            # Create solution image using existing create_solution_image function
-            solution_image = self.create_solution_image(grid)
+            # Highlight the digits filled in by the solver
+            solution_image = render_grid(grid, self.original_grid, WEB_STYLE)
             
             # Convert numpy array to PIL Image
             solution_image_rgb = cv2.cvtColor(solution_image, cv2.COLOR_BGR2RGB)
@@ -160,70 +162,6 @@ class SimpleSudokuApp:
         except Exception as e:
             self.log_status(f"Error displaying solution image: {str(e)}")
             
-    def read_sudoku_from_csv(self, csv_file):
-        """Read Sudoku puzzle from CSV file"""
-        grid = []
-        with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                grid.append([int(cell) for cell in row])
-        return np.array(grid)
-    
-    def is_valid(self, grid, row, col, num):
-        """Check if placing 'num' at position (row, col) is valid"""
-        # Check row
-        for x in range(9):
-            if grid[row][x] == num:
-                return False
-        
-        # Check column
-        for x in range(9):
-            if grid[x][col] == num:
-                return False
-        
-        # Check 3x3 box
-        start_row = 3 * (row // 3)
-        start_col = 3 * (col // 3)
-        for i in range(3):
-            for j in range(3):
-                if grid[i + start_row][j + start_col] == num:
-                    return False
-        
-        return True
-    
-    def find_empty_cell(self, grid):
-        """Find an empty cell (cell with value 0)"""
-        for i in range(9):
-            for j in range(9):
-                if grid[i][j] == 0:
-                    return (i, j)
-        return None
-    
-    def solve_sudoku_backtrack(self, grid):
-        """Solve the Sudoku puzzle using backtracking"""
-        empty_cell = self.find_empty_cell(grid)
-        
-        if not empty_cell:
-            return True
-        
-        row, col = empty_cell
-        
-        for num in range(1, 10):
-            if self.is_valid(grid, row, col, num):
-                grid[row, col] = num
-                if self.solve_sudoku_backtrack(grid):
-                    return True
-                grid[row, col] = 0
-        
-        return False
-    
-    def save_sudoku_to_csv(self, grid, csv_file):
-        """Save Sudoku grid to CSV file"""
-        with open(csv_file, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            for row in grid:
-                writer.writerow(row)
-    
     def solve_and_save_sudoku(self):
         """Automatically detect and solve the uploaded Sudoku puzzle"""
         if not self.image_path:
@@ -235,30 +173,26 @@ class SimpleSudokuApp:
             self.log_status("Starting automatic Sudoku detection...")
             self.log_status(f"Processing: {os.path.basename(self.image_path)}")
             
-            # Run sudoku_to_csv.py with the uploaded image
-            cmd = [
-                "python", "sudoku_to_csv.py",
-                "--image", self.image_path,
-                "--out-grid", "sudoku_grid.csv",
-                "--out-cells", "sudoku_cells.csv"
-            ]
-            
-            # Check if tesseract path exists and add it if available
-            tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-            if os.path.exists(tesseract_path):
-                cmd.extend(["--tesseract", tesseract_path])
-                self.log_status("Using Tesseract OCR for digit recognition")
+            # Detect the grid in-process
+            tesseract_path = find_tesseract_cmd()
+            ocr_mode = default_ocr_mode(tesseract_path)
+            if ocr_mode == "knn":
+                self.log_status("Tesseract not found, using built-in digit classifier")
             else:
-                self.log_status("Tesseract not found, using basic detection")
-            
-            self.log_status("Running detection command...")
+                self.log_status("Using Tesseract OCR for digit recognition")
             
-            # Run the detection command
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
+            self.log_status("Running detection...")
             
-            if result.returncode != 0:
+            try:
+                bgr = cv2.imread(self.image_path)
+                if bgr is None:
+                    raise RuntimeError("Failed to read image (unsupported format or corrupted).")
+                grid, status, ink_ratio, _ = detect_sudoku(bgr, tesseract_path, ocr_mode)
+                save_sudoku_to_csv(grid, "sudoku_grid.csv")
+                write_cells_csv(grid, status, ink_ratio, "sudoku_cells.csv")
+            except Exception as e:
                 self.log_status(f"❌ Error during detection:")
-                self.log_status(result.stderr)
+                self.log_status(str(e))
                 messagebox.showerror("Error", "Sudoku detection failed!\nCheck the status log for details.")
                 return
             
@@ -267,28 +201,22 @@ class SimpleSudokuApp:
             self.log_status("  - sudoku_grid.csv")
             self.log_status("  - sudoku_cells.csv")
             
-            # Step 2: Read and solve the puzzle
-            self.log_status("Reading Sudoku puzzle from CSV...")
-            self.original_grid = self.read_sudoku_from_csv("sudoku_grid.csv")
+            # Step 2: Solve the detected puzzle
+            self.original_grid = grid
             
             self.log_status("Solving Sudoku puzzle...")
             solution = self.original_grid.copy()
             
-            if self.solve_sudoku_backtrack(solution):
+            if solve_in_place(solution):
                 self.solution_grid = solution
                 self.log_status("✅ Sudoku solved successfully!")
                 
                 # Save solution to CSV
-                self.save_sudoku_to_csv(solution, "sudoku_solution.csv")
+                save_sudoku_to_csv(solution, "sudoku_solution.csv")
                 self.log_status("💾 Solution saved to: sudoku_solution.csv")
                 
                 # Save comparison file
-                with open("sudoku_comparison.csv", 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(["row", "col", "original", "solution"])
-                    for i in range(9):
-                        for j in range(9):
-                            writer.writerow([i, j, self.original_grid[i][j], solution[i][j]])
+                save_comparison_csv(self.original_grid, solution, "sudoku_comparison.csv")
                 
                 self.log_status("📊 Comparison saved to: sudoku_comparison.csv")
                 
@@ -306,48 +234,6 @@ class SimpleSudokuApp:
             self.log_status(f"❌ Error solving Sudoku: {str(e)}")
             messagebox.showerror("Error", f"Failed to solve Sudoku: {str(e)}")
     
-    def create_solution_image(self, grid):
-        """Create visual image of solved Sudoku"""
-        # Image parameters
-        cell_size = 60
-        margin = 30
-        line_thickness = 2
-        
-        # Calculate total image size
-        total_size = 9 * cell_size + 2 * margin
-        
-        # Create white background
-        image = np.ones((total_size, total_size, 3), dtype=np.uint8) * 255
-        
-        # Draw grid lines
-        for i in range(10):
-            x = margin + i * cell_size
-            thickness = line_thickness * 2 if i % 3 == 0 else line_thickness
-            cv2.line(image, (x, margin), (x, total_size - margin), (0, 0, 0), thickness)
-            
-            y = margin + i * cell_size
-            cv2.line(image, (margin, y), (total_size - margin, y), (0, 0, 0), thickness)
-        
-        # Add numbers
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        font_scale = 1.2
-        font_thickness = 2
-        
-        for row in range(9):
-            for col in range(9):
-                x = margin + col * cell_size + cell_size // 2
-                y = margin + row * cell_size + cell_size // 2 + 10
-                
-                number = grid[row][col]
-                if number != 0:
-                    text = str(number)
-                    (text_width, text_height), baseline = cv2.getTextSize(text, font, font_scale, font_thickness)
-                    x = x - text_width // 2
-                    y = y + text_height // 2
-                    cv2.putText(image, text, (x, y), font, font_scale, (0, 0, 0), font_thickness)
-        
-        return image
-    
     def log_status(self, message):
         """Add message to status log"""
         self.status_text.insert(tk.END, message + "\n")
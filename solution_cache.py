@@ -0,0 +1,104 @@
+# solution_cache.py
+"""
+Content-addressed cache of solved puzzles for the web app.
+
+Entries are keyed by a hash of the 81-cell grid and the solver backend (on
+grids with several solutions the backends may return different ones) and kept
+in an in-process LRU of bounded size. An optional SQLite file under a cache directory acts as a
+second tier that is shared by workers and survives restarts.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+
+def grid_key(cells: Sequence[int], method: str) -> str:
+    """Canonical cache key for a flat 81-cell grid solved by backend `method`."""
+    text = method + ":" + "".join(str(int(v)) for v in cells)
+    return hashlib.sha256(text.encode("ascii")).hexdigest()
+
+
+class SolutionCache:
+    """Thread-safe LRU of solve results with an optional on-disk tier."""
+
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = None, name: str = "solutions"):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_path = None
+        self._db = None
+        self._db_pid = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db_path = os.path.join(cache_dir, f"{name}.sqlite3")
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier lazily, once per process, so forked workers never share a handle."""
+        if self._db_path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self._db_path, timeout=5.0, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+            self._db_pid = os.getpid()
+        return self._db
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            db = self._connection()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value FROM solutions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, value)
+            db = self._connection()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO solutions (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+                db.commit()
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "disk": self._db_path is not None,
+            }
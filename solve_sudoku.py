@@ -1,156 +1,180 @@
-import csv
-import numpy as np
+import argparse
+import itertools
 import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def read_sudoku_from_csv(csv_file):
-    """
-    Read Sudoku puzzle from CSV file
-    
-    Args:
-        csv_file: Path to the CSV file containing the Sudoku grid
-        
-    Returns:
-        numpy array: 9x9 Sudoku grid (0 for empty cells)
-    """
-    grid = []
-    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-        reader = csv.reader(file)
-        for row in reader:
-            grid.append([int(cell) for cell in row])
-    
-    return np.array(grid)
+from sudoku_core import (
+    DEFAULT_SOLVER, SOLVERS, format_puzzle_line, get_solver, line_to_grid, parse_puzzle_line,
+    print_sudoku_grid, read_puzzle_lines, read_sudoku_from_csv, save_comparison_csv,
+    save_sudoku_to_csv, solve_in_place,
+)
 
-def is_valid(grid, row, col, num):
+def solve_sudoku(grid, method=DEFAULT_SOLVER):
     """
-    Check if placing 'num' at position (row, col) is valid
+    Solve the Sudoku puzzle in place
     
     Args:
-        grid: Current Sudoku grid
-        row: Row index
-        col: Column index
-        num: Number to place
+        grid: 9x9 Sudoku grid
+        method: Solver backend, "bitmask" (constraint propagation) or "dlx" (exact cover)
         
     Returns:
-        bool: True if placement is valid, False otherwise
+        bool: True if solution found, False otherwise
     """
-    # Check row
-    for x in range(9):
-        if grid[row][x] == num:
-            return False
-    
-    # Check column
-    for x in range(9):
-        if grid[x][col] == num:
-            return False
-    
-    # Check 3x3 box
-    start_row = 3 * (row // 3)
-    start_col = 3 * (col // 3)
-    for i in range(3):
-        for j in range(3):
-            if grid[i + start_row][j + start_col] == num:
-                return False
-    
-    return True
+    return solve_in_place(grid, method)
 
-def find_empty_cell(grid):
+def solve_puzzle_chunk(lines, method=DEFAULT_SOLVER):
     """
-    Find an empty cell (cell with value 0)
+    Solve a chunk of one-line puzzles (runs inside worker processes)
     
     Args:
-        grid: Current Sudoku grid
+        lines: List of 81-character puzzle lines
+        method: Solver backend name
         
     Returns:
-        tuple: (row, col) of empty cell, or None if no empty cells
+        list: Solution lines, None for unsolvable or malformed puzzles
     """
-    for i in range(9):
-        for j in range(9):
-            if grid[i][j] == 0:
-                return (i, j)
-    return None
+    solver = get_solver(method)
+    results = []
+    for line in lines:
+        try:
+            solution = solver(parse_puzzle_line(line))
+        except ValueError:
+            solution = None
+        results.append(format_puzzle_line(solution) if solution else None)
+    return results
 
-def solve_sudoku(grid):
+def solve_puzzles(lines, workers=1, chunk_size=256, method=DEFAULT_SOLVER):
     """
-    Solve the Sudoku puzzle using backtracking
+    Solve a stream of one-line puzzles, optionally across a process pool
+    
+    Puzzles are sent to workers in chunks to amortize pickling, with at most
+    two chunks per worker in flight, so memory stays constant however long
+    the input is. Results are yielded in input order.
     
     Args:
-        grid: 9x9 Sudoku grid
+        lines: Iterable of 81-character puzzle lines
+        workers: Number of worker processes (1 solves in this process)
+        chunk_size: Puzzles per chunk sent to a worker
+        method: Solver backend name
         
-    Returns:
-        bool: True if solution found, False otherwise
+    Yields:
+        tuple: (puzzle line, solution line or None if unsolved)
     """
-    empty_cell = find_empty_cell(grid)
-    
-    # If no empty cell, puzzle is solved
-    if not empty_cell:
-        return True
-    
-    row, col = empty_cell
-    
-    # Try numbers 1-9
-    for num in range(1, 10):
-        if is_valid(grid, row, col, num):
-            # Place the number
-            grid[row][col] = num
-            
-            # Recursively try to solve the rest
-            if solve_sudoku(grid):
-                return True
-            
-            # If placing num didn't lead to a solution, backtrack
-            grid[row][col] = 0
+    get_solver(method)  # fail fast on an unknown backend
+    lines = iter(lines)
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
     
-    # No solution found with this number
-    return False
-
-def save_sudoku_to_csv(grid, csv_file):
-    """
-    Save Sudoku grid to CSV file
+    if workers <= 1:
+        for chunk in chunks:
+            yield from zip(chunk, solve_puzzle_chunk(chunk, method))
+        return
     
-    Args:
-        grid: 9x9 Sudoku grid
-        csv_file: Path to output CSV file
-    """
-    with open(csv_file, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        for row in grid:
-            writer.writerow(row)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(solve_puzzle_chunk, chunk, method)))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
 
-def print_sudoku_grid(grid, title="Sudoku Grid"):
+def write_solutions(results, fmt, out_file=None, out_dir="."):
     """
-    Print Sudoku grid in a nice format
+    Write each solution as soon as it arrives
     
     Args:
-        grid: 9x9 Sudoku grid
-        title: Title for the grid
-    """
-    print(f"\n{title}")
-    print("=" * 50)
-    
-    for i in range(9):
-        if i % 3 == 0 and i != 0:
-            print("-" * 21)
+        results: Iterable of (puzzle line, solution line or None)
+        fmt: "lines" (one solution per line, blank if unsolved), "csv" (one
+             9x9 CSV per puzzle) or "comparison" (one original-vs-solution CSV per puzzle)
+        out_file: Open text file for the "lines" format
+        out_dir: Directory for the per-puzzle CSV formats
         
-        row_str = ""
-        for j in range(9):
-            if j % 3 == 0 and j != 0:
-                row_str += "| "
-            
-            if grid[i][j] == 0:
-                row_str += ". "
+    Returns:
+        tuple: (puzzles seen, puzzles solved)
+    """
+    total = solved = 0
+    for total, (puzzle, solution) in enumerate(results, 1):
+        if solution is not None:
+            solved += 1
+        if fmt == "lines":
+            out_file.write((solution or "") + "\n")
+        elif solution is not None:
+            name = f"{fmt}_{total:06d}.csv"
+            if fmt == "csv":
+                save_sudoku_to_csv(line_to_grid(solution), os.path.join(out_dir, name))
             else:
-                row_str += f"{grid[i][j]} "
-        
-        print(row_str)
-    
-    print("=" * 50)
+                save_comparison_csv(line_to_grid(puzzle), line_to_grid(solution),
+                                    os.path.join(out_dir, name))
+    return total, solved
+
+def run_batch(args):
+    """Stream puzzles from a file or stdin, solve and write them, and report throughput"""
+    workers = args.workers or os.cpu_count() or 1
+    source = "stdin" if args.puzzles == "-" else args.puzzles
+    # Status goes to stderr so solution lines can be piped from stdout
+    print(f"Solving puzzles from: {source} ({workers} worker(s), {args.method})", file=sys.stderr)
+    
+    if args.format != "lines":
+        os.makedirs(args.out_dir, exist_ok=True)
+    
+    infile = sys.stdin if args.puzzles == "-" else open(args.puzzles, 'r', encoding='utf-8')
+    outfile = None
+    if args.format == "lines":
+        outfile = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    try:
+        start = time.perf_counter()
+        results = solve_puzzles(read_puzzle_lines(infile), workers, args.chunk_size, args.method)
+        total, solved = write_solutions(results, args.format, outfile, args.out_dir)
+        elapsed = time.perf_counter() - start
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not None and outfile is not sys.stdout:
+            outfile.close()
+    
+    if args.out and args.format == "lines":
+        print(f"💾 Solutions saved to: {args.out}", file=sys.stderr)
+    elif args.format != "lines":
+        print(f"💾 Per-puzzle CSVs saved to: {args.out_dir}", file=sys.stderr)
+    rate = total / elapsed if elapsed > 0 else float('inf')
+    print(f"✅ Solved {solved}/{total} puzzles in {elapsed:.2f}s ({rate:,.0f} puzzles/s)", file=sys.stderr)
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Solve a Sudoku puzzle stored as a 9x9 CSV.")
+    ap.add_argument("--method", default=DEFAULT_SOLVER, choices=sorted(SOLVERS),
+                    help="Solver backend to use.")
+    ap.add_argument("--grid", default="sudoku_grid.csv",
+                    help="Single-puzzle mode: 9x9 CSV to solve.")
+    ap.add_argument("--puzzles", default=None,
+                    help="Batch mode: file with one 81-character puzzle per line ('-' for stdin).")
+    ap.add_argument("--format", default="lines", choices=["lines", "csv", "comparison"],
+                    help="Batch mode: output format.")
+    ap.add_argument("--out", default=None,
+                    help="Batch mode: output file for solution lines (default stdout).")
+    ap.add_argument("--out-dir", default=".",
+                    help="Batch mode: directory for per-puzzle CSV output formats.")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Batch mode: worker processes (0 uses all cores).")
+    ap.add_argument("--chunk-size", type=int, default=256,
+                    help="Batch mode: puzzles sent to a worker at a time.")
+    return ap.parse_args()
 
 def main():
+    args = parse_args()
+    if args.puzzles:
+        run_batch(args)
+        return
+    
     print("Sudoku Solver")
     print("=" * 30)
     
-    # Input CSV file (the one we just created)
-    input_csv = "sudoku_grid.csv"
+    # Input CSV file (the one written by the detector by default)
+    input_csv = args.grid
     
     # Check if input file exists
     if not os.path.exists(input_csv):
@@ -167,11 +191,11 @@ def main():
         print_sudoku_grid(puzzle, "Original Puzzle")
         
         # Create a copy for solving
-        solution = puzzle.copy()
+        solution = [row[:] for row in puzzle]
         
         # Solve the puzzle
-        print("\nSolving Sudoku puzzle...")
-        if solve_sudoku(solution):
+        print(f"\nSolving Sudoku puzzle ({args.method})...")
+        if solve_in_place(solution, args.method):
             print("✅ Sudoku solved successfully!")
             
             # Display the solution
@@ -184,12 +208,7 @@ def main():
             
             # Also save a comparison file showing original vs solution
             comparison_csv = "sudoku_comparison.csv"
-            with open(comparison_csv, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["row", "col", "original", "solution"])
-                for i in range(9):
-                    for j in range(9):
-                        writer.writerow([i, j, puzzle[i][j], solution[i][j]])
+            save_comparison_csv(puzzle, solution, comparison_csv)
             
             print(f"📊 Comparison saved to: {comparison_csv}")
             
@@ -0,0 +1,138 @@
+# sudoku_batch.py
+"""
+Vectorized batch solver for many Sudoku grids at once.
+
+All N grids are held as one 0/1 candidate tensor of 81 cells x N grids x 9
+digits. Naked and hidden singles are eliminated for the whole batch with a
+few matrix products per round; only grids that still have open cells once
+propagation stalls are handed to the per-grid solver engine.
+"""
+from typing import Tuple
+
+import numpy as np
+
+from sudoku_core.engine import CELL_UNITS, DEFAULT_SOLVER, get_solver
+
+# Batch status codes
+STATUS_UNSOLVABLE = 0   # contradiction, or no solution found by search
+STATUS_PROPAGATED = 1   # solved by candidate elimination alone
+STATUS_SEARCHED = 2     # solved by the per-grid fallback search
+
+# (27, 81) cell membership of each unit and (81, 81) peer relation
+UNIT_MEMBERS = np.zeros((27, 81), dtype=np.float32)
+for _cell, _units in enumerate(CELL_UNITS):
+    UNIT_MEMBERS[list(_units), _cell] = 1.0
+PEERS = ((UNIT_MEMBERS.T @ UNIT_MEMBERS) > 0).astype(np.float32)
+np.fill_diagonal(PEERS, 0.0)
+ONES = np.ones(9, dtype=np.float32)  # sums over the digit axis as a GEMV
+
+
+def _apply(matrix: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Multiply a (k, 81) cell matrix into a cell-major (81, n, 9) tensor with one GEMM."""
+    n = x.shape[1]
+    return (matrix @ x.reshape(81, n * 9)).reshape(-1, n, 9)
+
+
+def _propagate_batch(cand: np.ndarray) -> np.ndarray:
+    """
+    Eliminate naked and hidden singles in place until no grid changes
+
+    Args:
+        cand: (81, N, 9) cell-major float32 0/1 candidate tensor
+
+    Returns:
+        numpy array: (N,) bool, True for grids that reached a contradiction
+    """
+    n = cand.shape[1]
+    dead = np.zeros(n, dtype=bool)
+    active = np.arange(n)
+    while active.size:
+        c = cand[:, active]
+        counts = c @ ONES
+        before = counts.sum(axis=0)
+
+        # Naked singles: remove a fixed cell's digit from all of its peers
+        fixed = c * (counts == 1)[:, :, None]
+        c *= _apply(PEERS, fixed) == 0
+
+        # Hidden singles: a digit with one possible cell in some unit is fixed there
+        per_unit = _apply(UNIT_MEMBERS, c)                              # (27, n, 9)
+        only = UNIT_MEMBERS.T @ (per_unit == 1).reshape(27, -1).astype(np.float32)
+        hidden = c * (only.reshape(c.shape) > 0)
+        n_hidden = hidden @ ONES
+        c = np.where((n_hidden > 0)[:, :, None], hidden, c)
+
+        counts = c @ ONES
+        bad = (
+            (counts == 0).any(axis=0)
+            | (n_hidden > 1).any(axis=0)
+            | (per_unit == 0).any(axis=(0, 2))
+        )
+        cand[:, active] = c
+        dead[active[bad]] = True
+
+        changed = counts.sum(axis=0) != before
+        active = active[changed & ~bad]
+    return dead
+
+
+def _propagate_chunk(flat: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run candidate elimination on an (n, 81) chunk; returns filled cells, complete and dead flags."""
+    cand = np.ones((flat.shape[0], 81, 9), dtype=np.float32)
+    given = flat > 0
+    cand[given] = np.eye(9, dtype=np.float32)[flat[given] - 1]
+    cand = np.ascontiguousarray(cand.transpose(1, 0, 2))
+
+    # Givens that clash are caught before propagation would hide them
+    fixed = cand * given.T[:, :, None]
+    clash = (_apply(UNIT_MEMBERS, fixed) > 1).any(axis=(0, 2))
+
+    dead = _propagate_batch(cand) | clash
+    counts = (cand @ ONES).T
+    digits = (cand.argmax(axis=2).T + 1).astype(np.uint8)
+    return np.where(counts == 1, digits, 0).astype(np.uint8), (counts == 1).all(axis=1), dead
+
+
+def solve_batch(
+    grids: np.ndarray,
+    method: str = DEFAULT_SOLVER,
+    chunk_size: int = 256,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve a batch of puzzles
+
+    Args:
+        grids: (N, 9, 9) array of digits, 0 for empty cells
+        method: Solver backend used for grids that propagation cannot finish
+        chunk_size: Grids propagated together; small enough to keep the tensors in cache
+
+    Returns:
+        tuple: (N, 9, 9) uint8 solutions (the partially filled grid where unsolved)
+               and (N,) int8 status vector of STATUS_* codes
+    """
+    grids = np.asarray(grids)
+    if grids.ndim != 3 or grids.shape[1:] != (9, 9):
+        raise ValueError(f"Expected an (N, 9, 9) array, got shape {grids.shape}")
+    if grids.size and (grids.min() < 0 or grids.max() > 9):
+        raise ValueError("Grid values must be in the range 0-9")
+    solver = get_solver(method)
+
+    n = grids.shape[0]
+    flat = grids.reshape(n, 81).astype(np.uint8)
+    solutions = np.zeros((n, 81), dtype=np.uint8)
+    status = np.full(n, STATUS_UNSOLVABLE, dtype=np.int8)
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        filled, complete, dead = _propagate_chunk(flat[start:stop])
+        solutions[start:stop] = filled
+        status[start:stop][complete & ~dead] = STATUS_PROPAGATED
+
+        # Only grids with open cells left fall back to per-grid search
+        for i in start + np.flatnonzero(~complete & ~dead):
+            solution = solver(solutions[i].tolist())
+            if solution is not None:
+                solutions[i] = solution
+                status[i] = STATUS_SEARCHED
+
+    return solutions.reshape(n, 9, 9), status
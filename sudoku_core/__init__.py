@@ -0,0 +1,62 @@
+# sudoku_core/__init__.py
+"""
+Shared Sudoku building blocks for the CLI, the web app and the desktop app.
+
+Importing the package loads only the pure-Python pieces: grid I/O and checks
+(sudoku_core.grid) and the solver backends (sudoku_core.engine, with the DLX
+solver in sudoku_core.dlx). Rendering (sudoku_core.render) needs NumPy and
+loads OpenCV/Pillow on first use; OCR settings are in sudoku_core.ocr and the
+recognizers in sudoku_to_csv. Neither is imported from here.
+"""
+from .engine import (
+    DEFAULT_SOLVER,
+    SOLVERS,
+    count_solutions,
+    find_solutions,
+    flatten_grid,
+    get_solver,
+    solve_cells,
+    solve_in_place,
+)
+from .grid import (
+    completes,
+    find_empty_cell,
+    format_puzzle_line,
+    is_solution,
+    is_valid,
+    line_to_grid,
+    parse_puzzle_line,
+    print_sudoku_grid,
+    read_puzzle_lines,
+    read_sudoku_from_csv,
+    save_comparison_csv,
+    save_sudoku_to_csv,
+    write_cells_csv,
+)
+from .stats import SearchBudgetExceeded, SearchStats
+
+__all__ = [
+    "DEFAULT_SOLVER",
+    "SOLVERS",
+    "SearchBudgetExceeded",
+    "SearchStats",
+    "completes",
+    "count_solutions",
+    "find_empty_cell",
+    "find_solutions",
+    "flatten_grid",
+    "format_puzzle_line",
+    "get_solver",
+    "is_solution",
+    "is_valid",
+    "line_to_grid",
+    "parse_puzzle_line",
+    "print_sudoku_grid",
+    "read_puzzle_lines",
+    "read_sudoku_from_csv",
+    "save_comparison_csv",
+    "save_sudoku_to_csv",
+    "solve_cells",
+    "solve_in_place",
+    "write_cells_csv",
+]
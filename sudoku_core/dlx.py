@@ -0,0 +1,227 @@
+# sudoku_core/dlx.py
+"""
+Dancing Links (Algorithm X) exact-cover Sudoku solver.
+
+Sudoku is encoded as an exact-cover problem with 729 rows (cell, digit) and
+324 constraint columns: every cell filled once, and every digit once per row,
+column and box. The linked matrix is built once per thread and reused across
+puzzles; givens are covered before the search and uncovered afterwards, which
+leaves the matrix ready for the next solve.
+"""
+import threading
+from typing import Iterator, List, Optional, Sequence
+
+from .stats import SearchStats
+
+N_COLUMNS = 324
+
+
+class DancingLinks:
+    """Exact-cover matrix for 9x9 Sudoku stored as parallel link arrays."""
+
+    def __init__(self):
+        # Node 0 is the root, 1..324 are column headers, the rest are row nodes
+        n_nodes = 1 + N_COLUMNS + 729 * 4
+        self.L = [0] * n_nodes
+        self.R = [0] * n_nodes
+        self.U = list(range(n_nodes))
+        self.D = list(range(n_nodes))
+        self.C = [0] * n_nodes
+        self.ROW = [-1] * n_nodes
+        self.S = [0] * (N_COLUMNS + 1)
+        self.row_node = [0] * 729
+
+        for c in range(N_COLUMNS + 1):
+            self.L[c] = c - 1 if c else N_COLUMNS
+            self.R[c] = c + 1 if c < N_COLUMNS else 0
+            self.C[c] = c
+
+        node = N_COLUMNS + 1
+        for r in range(729):
+            cell, d = divmod(r, 9)
+            row, col = divmod(cell, 9)
+            box = (row // 3) * 3 + col // 3
+            columns = (
+                1 + cell,
+                1 + 81 + row * 9 + d,
+                1 + 162 + col * 9 + d,
+                1 + 243 + box * 9 + d,
+            )
+            first = node
+            self.row_node[r] = first
+            for k, c in enumerate(columns):
+                # Append to the bottom of column c
+                self.C[node] = c
+                self.ROW[node] = r
+                self.U[node] = self.U[c]
+                self.D[node] = c
+                self.D[self.U[c]] = node
+                self.U[c] = node
+                self.S[c] += 1
+                # Link into the row ring
+                self.L[node] = first + (k - 1) % 4
+                self.R[node] = first + (k + 1) % 4
+                node += 1
+
+    # -------------------- Cover / uncover --------------------
+    def _cover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+
+    def _select(self, node: int) -> None:
+        """Cover the remaining columns of the row containing an already-covered node."""
+        j = self.R[node]
+        while j != node:
+            self._cover(self.C[j])
+            j = self.R[j]
+
+    def _deselect(self, node: int) -> None:
+        j = self.L[node]
+        while j != node:
+            self._uncover(self.C[j])
+            j = self.L[j]
+
+    # -------------------- Search --------------------
+    def _search(self, rows: List[int], stats: SearchStats) -> Iterator[List[int]]:
+        stats.nodes += 1
+        if stats.nodes > stats.max_nodes:
+            stats.budget_reached()
+        R, D, S = self.R, self.D, self.S
+        if R[0] == 0:
+            yield rows
+            return
+
+        # Choose the column with the fewest remaining rows
+        c = R[0]
+        best, size = c, S[c]
+        while c and size > 1:
+            if S[c] < size:
+                best, size = c, S[c]
+            c = R[c]
+        if size == 0:
+            stats.backtracks += 1
+            return
+
+        self._cover(best)
+        try:
+            r = D[best]
+            while r != best:
+                rows.append(self.ROW[r])
+                self._select(r)
+                try:
+                    yield from self._search(rows, stats)
+                finally:
+                    self._deselect(r)
+                    rows.pop()
+                r = D[r]
+        finally:
+            self._uncover(best)
+
+    def solutions(self, cells: Sequence[int], stats: Optional[SearchStats] = None) -> Iterator[List[int]]:
+        """
+        Enumerate solutions of a puzzle, restoring the matrix when done
+
+        Args:
+            cells: 81 ints in row-major order (0 for empty cells)
+            stats: Optional SearchStats to accumulate nodes and backtracks into
+
+        Returns:
+            iterator of solved 81-cell lists
+        """
+        if len(cells) != 81:
+            raise ValueError(f"Expected 81 cells, got {len(cells)}")
+        givens = []
+        for i, v in enumerate(cells):
+            v = int(v)
+            if v == 0:
+                continue
+            if not 1 <= v <= 9:
+                raise ValueError(f"Invalid value {v} at cell {i}")
+            givens.append(i * 9 + v - 1)
+
+        covered = []
+        try:
+            for r in givens:
+                node = self.row_node[r]
+                # A given whose constraints are already taken clashes with another given
+                j = node
+                while True:
+                    c = self.C[j]
+                    if self.L[self.R[c]] != c:
+                        return
+                    j = self.R[j]
+                    if j == node:
+                        break
+                self._cover(self.C[node])
+                self._select(node)
+                covered.append(node)
+
+            base = [0] * 81
+            for r in givens:
+                base[r // 9] = r % 9 + 1
+            for rows in self._search([], stats if stats is not None else SearchStats()):
+                solution = base[:]
+                for r in rows:
+                    solution[r // 9] = r % 9 + 1
+                yield solution
+        finally:
+            for node in reversed(covered):
+                self._deselect(node)
+                self._uncover(self.C[node])
+
+
+_local = threading.local()
+
+
+def _matrix() -> DancingLinks:
+    matrix = getattr(_local, "matrix", None)
+    if matrix is None:
+        matrix = _local.matrix = DancingLinks()
+    return matrix
+
+
+def iter_solutions_dlx(cells: Sequence[int], stats: Optional[SearchStats] = None) -> Iterator[List[int]]:
+    """Lazily enumerate solutions using this thread's shared exact-cover matrix."""
+    return _matrix().solutions(cells, stats)
+
+
+def solve_cells_dlx(cells: Sequence[int], stats: Optional[SearchStats] = None) -> Optional[List[int]]:
+    """
+    Solve a puzzle given as a flat list with Dancing Links
+
+    Args:
+        cells: 81 ints in row-major order (0 for empty cells)
+        stats: Optional SearchStats to accumulate nodes and backtracks into
+
+    Returns:
+        list: solved 81 cells, or None if the puzzle has no solution
+    """
+    gen = iter_solutions_dlx(cells, stats)
+    try:
+        return next(gen, None)
+    finally:
+        gen.close()
@@ -0,0 +1,293 @@
+# sudoku_core/engine.py
+"""
+Bitmask constraint-propagation Sudoku solver.
+
+The board is a flat list of 81 ints (0 for empty) plus 27 bitmasks holding the
+digits already placed in each row, column and box. Candidates for a cell are
+the digits missing from all three of its units. The search fills naked and
+hidden singles, then branches on the first empty cell in row-major order with
+its digits in ascending order. Singles are forced in every solution below a
+node, so solutions come out in lexicographic order: the first one is the grid
+the original first-empty-cell backtracker returned, also for puzzles with
+several solutions.
+"""
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from .dlx import iter_solutions_dlx, solve_cells_dlx
+from .stats import SearchStats
+
+ALL_DIGITS = 0x1FF
+
+# (row unit, column unit, box unit) for every cell; units 0-8 are rows,
+# 9-17 are columns and 18-26 are boxes.
+CELL_UNITS = [
+    (i // 9, 9 + i % 9, 18 + (i // 27) * 3 + (i % 9) // 3) for i in range(81)
+]
+UNITS = [[i for i in range(81) if u in CELL_UNITS[i]] for u in range(27)]
+
+DIGIT_BIT = [0] + [1 << (d - 1) for d in range(1, 10)]
+BIT_DIGIT = {1 << (d - 1): d for d in range(1, 10)}
+MASK_DIGITS = [tuple(d for d in range(1, 10) if m & DIGIT_BIT[d]) for m in range(512)]
+
+
+# -------------------- Board --------------------
+class Board:
+    """Flat 81-cell board with per-unit masks of placed digits."""
+
+    __slots__ = ("cells", "used", "consistent")
+
+    def __init__(self, cells: Sequence[int]):
+        if len(cells) != 81:
+            raise ValueError(f"Expected 81 cells, got {len(cells)}")
+        self.cells = [0] * 81
+        self.used = [0] * 27
+        self.consistent = True  # False when two givens clash in a unit
+        for i, v in enumerate(cells):
+            v = int(v)
+            if v == 0:
+                continue
+            if not 1 <= v <= 9:
+                raise ValueError(f"Invalid value {v} at cell {i}")
+            if not self.candidates(i) & DIGIT_BIT[v]:
+                self.consistent = False
+            self.place(i, v)
+
+    def candidates(self, i: int) -> int:
+        a, b, c = CELL_UNITS[i]
+        used = self.used
+        return ALL_DIGITS & ~(used[a] | used[b] | used[c])
+
+    def place(self, i: int, d: int) -> None:
+        bit = DIGIT_BIT[d]
+        a, b, c = CELL_UNITS[i]
+        used = self.used
+        self.cells[i] = d
+        used[a] |= bit
+        used[b] |= bit
+        used[c] |= bit
+
+    def clear(self, i: int) -> None:
+        bit = DIGIT_BIT[self.cells[i]]
+        a, b, c = CELL_UNITS[i]
+        used = self.used
+        self.cells[i] = 0
+        used[a] &= ~bit
+        used[b] &= ~bit
+        used[c] &= ~bit
+
+    def empties(self) -> List[int]:
+        return [i for i, v in enumerate(self.cells) if v == 0]
+
+
+# -------------------- Search --------------------
+def _propagate(board: Board, empties: List[int], trail: List[int]) -> Optional[List[int]]:
+    """Fill naked and hidden singles. Returns the cells still empty, or None on contradiction."""
+    cells = board.cells
+    used = board.used
+    while True:
+        # Naked singles: cells with exactly one candidate
+        remaining = []
+        progress = False
+        for i in empties:
+            a, b, c = CELL_UNITS[i]
+            m = ALL_DIGITS & ~(used[a] | used[b] | used[c])
+            if not m:
+                return None
+            if m & (m - 1) == 0:
+                cells[i] = BIT_DIGIT[m]
+                used[a] |= m
+                used[b] |= m
+                used[c] |= m
+                trail.append(i)
+                progress = True
+            else:
+                remaining.append(i)
+        empties = remaining
+        if progress:
+            continue
+        if not empties:
+            return empties
+
+        # Hidden singles: digits with exactly one possible cell in a unit
+        for u, unit in enumerate(UNITS):
+            once = twice = 0
+            for i in unit:
+                if not cells[i]:
+                    m = board.candidates(i)
+                    twice |= once & m
+                    once |= m
+            if (once | used[u]) != ALL_DIGITS:
+                return None
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for i in unit:
+                    if not cells[i] and board.candidates(i) & bit:
+                        board.place(i, BIT_DIGIT[bit])
+                        trail.append(i)
+                        progress = True
+                        break
+                else:
+                    # Another hidden single already took the only cell for this digit
+                    return None
+        if not progress:
+            return empties
+        empties = [i for i in empties if not cells[i]]
+
+
+def _search(board: Board, empties: List[int], stats: SearchStats) -> Iterator[List[int]]:
+    stats.nodes += 1
+    if stats.nodes > stats.max_nodes:
+        stats.budget_reached()
+    trail: List[int] = []
+    try:
+        empties = _propagate(board, empties, trail)
+        if empties is None:
+            stats.backtracks += 1
+            return
+        if not empties:
+            yield board.cells[:]
+            return
+
+        # Branch on the first empty cell (empties stay in row-major order), so
+        # the first solution is the lexicographically smallest; propagation
+        # keeps the tree small enough that picking the most constrained cell
+        # instead buys little and would return a different grid when the
+        # puzzle is not unique
+        best, rest = empties[0], empties[1:]
+        for d in MASK_DIGITS[board.candidates(best)]:
+            board.place(best, d)
+            yield from _search(board, rest, stats)
+            board.clear(best)
+    finally:
+        for i in trail:
+            board.clear(i)
+
+
+def iter_solutions(cells: Sequence[int], stats: Optional[SearchStats] = None) -> Iterator[List[int]]:
+    """
+    Lazily enumerate solutions of a puzzle in lexicographic (row-major) order
+
+    Args:
+        cells: 81 ints in row-major order (0 for empty cells)
+        stats: Optional SearchStats to accumulate nodes and backtracks into
+
+    Returns:
+        iterator of solved 81-cell lists
+    """
+    board = Board(cells)
+    if not board.consistent:
+        return iter(())
+    return _search(board, board.empties(), stats if stats is not None else SearchStats())
+
+
+# -------------------- Public API --------------------
+def flatten_grid(grid) -> List[int]:
+    """Convert a 9x9 grid (nested lists or NumPy array) to a flat list of 81 ints."""
+    return [int(v) for row in grid for v in row]
+
+
+def solve_cells(cells: Sequence[int], stats: Optional[SearchStats] = None) -> Optional[List[int]]:
+    """
+    Solve a puzzle given as a flat list
+
+    Args:
+        cells: 81 ints in row-major order (0 for empty cells)
+        stats: Optional SearchStats to accumulate nodes and backtracks into
+
+    Returns:
+        list: lexicographically smallest solution (row-major), or None if the
+              puzzle has no solution
+    """
+    return next(iter_solutions(cells, stats), None)
+
+
+# -------------------- Backends --------------------
+# Every backend also accepts an optional SearchStats as second argument. All
+# agree on puzzles with one solution; with several, "bitmask" returns the
+# lexicographically smallest and "dlx" whichever its column order finds first.
+SOLVERS: Dict[str, Callable[..., Optional[List[int]]]] = {
+    "bitmask": solve_cells,
+    "dlx": solve_cells_dlx,
+}
+SOLUTION_ITERATORS: Dict[str, Callable[..., Iterator[List[int]]]] = {
+    "bitmask": iter_solutions,
+    "dlx": iter_solutions_dlx,
+}
+DEFAULT_SOLVER = "bitmask"
+
+
+def get_solver(method: str) -> Callable[..., Optional[List[int]]]:
+    """Look up a solver backend by name."""
+    try:
+        return SOLVERS[method]
+    except KeyError:
+        raise ValueError(
+            f"Unknown solver '{method}'. Choose from: {', '.join(sorted(SOLVERS))}"
+        ) from None
+
+
+def find_solutions(
+    cells: Sequence[int], limit: int = 2, method: str = DEFAULT_SOLVER, stats: Optional[SearchStats] = None
+) -> List[List[int]]:
+    """
+    Collect up to `limit` solutions, stopping the search as soon as the limit is reached
+
+    Args:
+        cells: 81 ints in row-major order (0 for empty cells)
+        limit: Maximum number of solutions to return
+        method: Solver backend name (see SOLVERS)
+        stats: Optional SearchStats to accumulate nodes and backtracks into
+
+    Returns:
+        list: solved 81-cell lists, at most `limit` of them
+    """
+    get_solver(method)
+    solutions = SOLUTION_ITERATORS[method](cells, stats)
+    try:
+        return list(islice(solutions, limit))
+    finally:
+        close = getattr(solutions, "close", None)
+        if close is not None:
+            close()
+
+
+def count_solutions(grid, limit: int = 2, method: str = DEFAULT_SOLVER) -> int:
+    """
+    Count solutions of a puzzle up to `limit`
+
+    With the default limit of 2 this is a uniqueness check: 0 means
+    unsolvable, 1 unique and 2 under-constrained.
+
+    Args:
+        grid: 9x9 Sudoku grid, or a flat sequence of 81 ints
+        limit: Stop counting once this many solutions are found
+        method: Solver backend name (see SOLVERS)
+
+    Returns:
+        int: number of solutions found, at most `limit`
+    """
+    cells = list(grid) if len(grid) == 81 else flatten_grid(grid)
+    return len(find_solutions(cells, limit, method))
+
+
+def solve_in_place(grid, method: str = DEFAULT_SOLVER) -> bool:
+    """
+    Solve a 9x9 grid in place, filling its empty cells
+
+    Args:
+        grid: 9x9 Sudoku grid (nested lists or NumPy array)
+        method: Solver backend name (see SOLVERS)
+
+    Returns:
+        bool: True if solution found, False otherwise
+    """
+    solution = get_solver(method)(flatten_grid(grid))
+    if solution is None:
+        return False
+    for r in range(9):
+        for c in range(9):
+            grid[r][c] = solution[r * 9 + c]
+    return True
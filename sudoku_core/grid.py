@@ -0,0 +1,229 @@
+# sudoku_core/grid.py
+"""
+Grid helpers shared by the CLI, the web app and the desktop app.
+
+Grids are 9x9 nested lists (NumPy arrays work too, but nothing here imports
+NumPy): CSV input and output, the one-line 81-character puzzle format,
+placement checks and console printing.
+"""
+import csv
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+
+Grid = List[List[int]]
+
+
+# -------------------- CSV --------------------
+def read_sudoku_from_csv(csv_file: str) -> Grid:
+    """
+    Read Sudoku puzzle from CSV file
+
+    Args:
+        csv_file: Path to the CSV file containing the Sudoku grid
+
+    Returns:
+        list: 9x9 Sudoku grid (0 for empty cells)
+    """
+    with open(csv_file, "r", newline="", encoding="utf-8") as file:
+        return [[int(cell) for cell in row] for row in csv.reader(file) if row]
+
+
+def save_sudoku_to_csv(grid, csv_file: str) -> None:
+    """
+    Save Sudoku grid to CSV file
+
+    Args:
+        grid: 9x9 Sudoku grid
+        csv_file: Path to output CSV file
+    """
+    with open(csv_file, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        for row in grid:
+            writer.writerow([int(v) for v in row])
+
+
+def save_comparison_csv(puzzle, solution, csv_file: str) -> None:
+    """
+    Save a per-cell comparison of the original puzzle and its solution
+
+    Args:
+        puzzle: 9x9 original Sudoku grid
+        solution: 9x9 solved Sudoku grid
+        csv_file: Path to output CSV file
+    """
+    with open(csv_file, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["row", "col", "original", "solution"])
+        for i in range(9):
+            for j in range(9):
+                writer.writerow([i, j, int(puzzle[i][j]), int(solution[i][j])])
+
+
+def write_cells_csv(grid, status, ink_ratio, csv_file: str) -> None:
+    """
+    Save the per-cell detection details (status, value and ink share)
+
+    Args:
+        grid: 9x9 detected digits
+        status: 9x9 "number" / "blank" labels
+        ink_ratio: 9x9 ink shares
+        csv_file: Path to output CSV file
+    """
+    with open(csv_file, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["row", "col", "status", "value", "ink_ratio"])
+        for r in range(9):
+            for c in range(9):
+                writer.writerow([r, c, status[r][c], int(grid[r][c]), f"{ink_ratio[r][c]:.4f}"])
+
+
+# -------------------- One-line format --------------------
+def parse_puzzle_line(line: str) -> List[int]:
+    """
+    Parse a puzzle in the one-line 81-character format
+
+    Args:
+        line: 81 characters in row-major order, '0' or '.' for empty cells
+
+    Returns:
+        list: 81 ints (0 for empty cells)
+    """
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError(f"Expected 81 characters, got {len(line)}")
+    cells = []
+    for ch in line:
+        if ch == ".":
+            cells.append(0)
+        elif ch.isdigit():
+            cells.append(int(ch))
+        else:
+            raise ValueError(f"Invalid character '{ch}' in puzzle line")
+    return cells
+
+
+def format_puzzle_line(cells: Sequence[int]) -> str:
+    """
+    Format 81 cells as a one-line puzzle string
+
+    Args:
+        cells: 81 ints in row-major order
+
+    Returns:
+        str: 81-character line
+    """
+    return "".join(str(v) for v in cells)
+
+
+def line_to_grid(line: str) -> Grid:
+    """Convert an 81-character puzzle line to a 9x9 list of ints."""
+    cells = parse_puzzle_line(line)
+    return [cells[r * 9:(r + 1) * 9] for r in range(9)]
+
+
+def read_puzzle_lines(file: TextIO) -> Iterator[str]:
+    """
+    Stream puzzle lines from an open text file, skipping blanks and '#' comments
+
+    Args:
+        file: Open text file (or sys.stdin)
+
+    Yields:
+        str: One stripped puzzle line at a time
+    """
+    for line in file:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+# -------------------- Checks --------------------
+def is_valid(grid, row: int, col: int, num: int) -> bool:
+    """
+    Check if placing 'num' at position (row, col) is valid
+
+    Args:
+        grid: Current Sudoku grid
+        row: Row index
+        col: Column index
+        num: Number to place
+
+    Returns:
+        bool: True if placement is valid, False otherwise
+    """
+    if any(grid[row][x] == num for x in range(9)):
+        return False
+    if any(grid[x][col] == num for x in range(9)):
+        return False
+    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
+    return not any(
+        grid[start_row + i][start_col + j] == num for i in range(3) for j in range(3)
+    )
+
+
+def find_empty_cell(grid) -> Optional[Tuple[int, int]]:
+    """
+    Find an empty cell (cell with value 0)
+
+    Args:
+        grid: Current Sudoku grid
+
+    Returns:
+        tuple: (row, col) of empty cell, or None if no empty cells
+    """
+    for i in range(9):
+        for j in range(9):
+            if grid[i][j] == 0:
+                return (i, j)
+    return None
+
+
+def completes(puzzle, solution) -> bool:
+    """True if 9x9 `solution` is filled and keeps every given of 9x9 `puzzle`."""
+    if len(puzzle) != 9 or len(solution) != 9:
+        return False
+    return all(
+        len(prow) == len(srow) == 9 and all(s != 0 and p in (0, s) for p, s in zip(prow, srow))
+        for prow, srow in zip(puzzle, solution)
+    )
+
+
+def is_solution(puzzle: Sequence[int], solution: Optional[Sequence[int]]) -> bool:
+    """True if the 81 `solution` cells keep the givens of `puzzle` and every row, column and box holds 1-9 once."""
+    if solution is None or len(solution) != 81:
+        return False
+    if any(p and p != s for p, s in zip(puzzle, solution)):
+        return False
+    digits = set(range(1, 10))
+    for k in range(9):
+        row = solution[k * 9:(k + 1) * 9]
+        col = solution[k::9]
+        r0, c0 = 3 * (k // 3), 3 * (k % 3)
+        box = [solution[(r0 + i) * 9 + c0 + j] for i in range(3) for j in range(3)]
+        if set(row) != digits or set(col) != digits or set(box) != digits:
+            return False
+    return True
+
+# -------------------- Console --------------------
+def print_sudoku_grid(grid, title: str = "Sudoku Grid") -> None:
+    """
+    Print Sudoku grid in a nice format
+
+    Args:
+        grid: 9x9 Sudoku grid
+        title: Title for the grid
+    """
+    print(f"\n{title}")
+    print("=" * 50)
+
+    for i in range(9):
+        if i % 3 == 0 and i != 0:
+            print("-" * 21)
+
+        row_str = ""
+        for j in range(9):
+            if j % 3 == 0 and j != 0:
+                row_str += "| "
+            row_str += ". " if grid[i][j] == 0 else f"{grid[i][j]} "
+        print(row_str)
+
+    print("=" * 50)
@@ -0,0 +1,27 @@
+# sudoku_core/ocr.py
+"""
+OCR settings that can be resolved without loading the image stack.
+
+The recognizers themselves live in sudoku_to_csv (OpenCV, and pytesseract for
+the Tesseract modes); this module only names them and finds Tesseract, so a
+process can validate its configuration before any of that is imported.
+"""
+import os
+import shutil
+from typing import Optional
+
+# Recognizer names, in the order sudoku_to_csv.RECOGNIZERS registers them
+OCR_MODES = ("batch", "cell", "knn")
+
+WINDOWS_TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+
+def find_tesseract_cmd() -> Optional[str]:
+    """Default Windows install if present, else None (tesseract on PATH)."""
+    return WINDOWS_TESSERACT_CMD if os.path.exists(WINDOWS_TESSERACT_CMD) else None
+
+
+def default_ocr_mode(tesseract_cmd: Optional[str] = None) -> str:
+    """Per-cell Tesseract ("cell") when it is installed, otherwise the built-in classifier ("knn")."""
+    cmd = tesseract_cmd or find_tesseract_cmd() or "tesseract"
+    return "cell" if os.path.exists(cmd) or shutil.which(cmd) else "knn"
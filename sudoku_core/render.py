@@ -0,0 +1,269 @@
+# sudoku_core/render.py
+"""
+Solution image rendering from a pre-rendered glyph atlas.
+
+For each style the empty grid (lines and optional title) and the nine digit
+glyphs - once per colour, so given and solved digits can look different -
+are drawn a single time and cached. A grid is then composed by gathering one
+tile per cell and combining it with the background in a single NumPy
+operation; no per-digit text layout happens per image.
+
+OpenCV and Pillow are imported on first use, so importing this module for its
+styles and format table stays cheap.
+"""
+import io
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+FONT = 0  # cv2.FONT_HERSHEY_SIMPLEX, without importing cv2 here
+
+
+class RenderStyle(NamedTuple):
+    cell_size: int = 60
+    margin: int = 30
+    line_thickness: int = 2
+    font_scale: float = 1.2
+    font_thickness: int = 2
+    text_offset: int = 10            # baseline shift below the cell centre (px)
+    title: Optional[str] = None
+    title_height: int = 0
+    given_color: Tuple[int, int, int] = (0, 0, 0)        # BGR
+    solved_color: Tuple[int, int, int] = (200, 90, 30)   # blue
+
+
+# Web app / desktop GUI look (600 x 600)
+WEB_STYLE = RenderStyle()
+# create_solution_only.py look (800 x 880 with title)
+PRINT_STYLE = RenderStyle(
+    cell_size=80, margin=40, font_scale=1.6, font_thickness=3, text_offset=0,
+    title="Sudoku Solution", title_height=80,
+)
+
+
+def _draw_background(style: RenderStyle) -> np.ndarray:
+    import cv2
+
+    cs, margin = style.cell_size, style.margin
+    total = 9 * cs + 2 * margin
+    image = np.full((total, total, 3), 255, dtype=np.uint8)
+    for i in range(10):
+        pos = margin + i * cs
+        thickness = style.line_thickness * 2 if i % 3 == 0 else style.line_thickness
+        cv2.line(image, (pos, margin), (pos, total - margin), (0, 0, 0), thickness)
+        cv2.line(image, (margin, pos), (total - margin, pos), (0, 0, 0), thickness)
+    if style.title:
+        framed = np.full((total + style.title_height, total, 3), 255, dtype=np.uint8)
+        framed[style.title_height:] = image
+        (tw, _), _ = cv2.getTextSize(style.title, FONT, 1.5, 3)
+        cv2.putText(framed, style.title, ((total - tw) // 2, 50), FONT, 1.5, (0, 0, 0), 3)
+        image = framed
+    return image
+
+
+def _draw_glyph(style: RenderStyle, digit: int, color: Tuple[int, int, int]) -> np.ndarray:
+    # One white cell with the digit placed exactly where the per-cell
+    # putText layout used to put it
+    import cv2
+
+    cs = style.cell_size
+    tile = np.full((cs, cs, 3), 255, dtype=np.uint8)
+    text = str(digit)
+    (tw, th), _ = cv2.getTextSize(text, FONT, style.font_scale, style.font_thickness)
+    x = cs // 2 - tw // 2
+    y = cs // 2 + style.text_offset + th // 2
+    cv2.putText(tile, text, (x, y), FONT, style.font_scale, color, style.font_thickness)
+    return tile
+
+
+@lru_cache(maxsize=8)
+def glyph_atlas(style: RenderStyle) -> Tuple[np.ndarray, np.ndarray]:
+    """Cached (background, tiles) for a style; tiles[k * 10 + d] is digit d in colour k (0 given, 1 solved)."""
+    tiles = np.full((20, style.cell_size, style.cell_size, 3), 255, dtype=np.uint8)
+    for kind, color in enumerate((style.given_color, style.solved_color)):
+        for digit in range(1, 10):
+            tiles[kind * 10 + digit] = _draw_glyph(style, digit, color)
+    background = _draw_background(style)
+    background.setflags(write=False)
+    tiles.setflags(write=False)
+    return background, tiles
+
+
+def _tile_index(grid, givens) -> np.ndarray:
+    # (9, 9) index into the atlas tiles: 0 empty, d given digit, 10 + d solved digit
+    digits = np.asarray(grid, dtype=np.intp).reshape(9, 9)
+    solved = np.zeros((9, 9), dtype=bool) if givens is None else np.asarray(givens).reshape(9, 9) == 0
+    return np.where(digits > 0, digits + 10 * solved, 0)
+
+
+def _board(image: np.ndarray, style: RenderStyle) -> np.ndarray:
+    # (9, 9, cell, cell, ...) view of the cells of a rendered image
+    cs, top, left = style.cell_size, style.margin + style.title_height, style.margin
+    board = image[top:top + 9 * cs, left:left + 9 * cs]
+    return board.reshape(9, cs, 9, cs, *image.shape[2:]).swapaxes(1, 2)
+
+
+def render_grid(grid, givens=None, style: RenderStyle = WEB_STYLE) -> np.ndarray:
+    """
+    Render a 9x9 grid as a BGR image
+
+    Args:
+        grid: 9x9 digits (0 for empty cells)
+        givens: Optional 9x9 puzzle; its non-zero cells use the given colour,
+                all other digits the solved colour (without it every digit
+                uses the given colour)
+        style: RenderStyle preset
+
+    Returns:
+        numpy array: (H, W, 3) uint8 image
+    """
+    background, tiles = glyph_atlas(style)
+    image = background.copy()
+    board = _board(image, style)
+    # Dark glyph pixels win over the background, so grid lines under a tile survive
+    np.minimum(board, tiles[_tile_index(grid, givens)], out=board)
+    return image
+
+
+# -------------------- Encoded output --------------------
+IMAGE_FORMATS = {"png": "image/png", "webp": "image/webp", "svg": "image/svg+xml"}
+
+
+def _hex(color: Tuple[int, int, int]) -> str:
+    b, g, r = color
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def render_svg(grid, givens=None, style: RenderStyle = WEB_STYLE) -> str:
+    """Same layout as render_grid, written as SVG text (no raster work)."""
+    cs, margin, top = style.cell_size, style.margin, style.title_height
+    total = 9 * cs + 2 * margin
+    digits = np.asarray(grid, dtype=int).reshape(9, 9)
+    solved = np.zeros((9, 9), dtype=bool) if givens is None else np.asarray(givens).reshape(9, 9) == 0
+    font_size = round(style.font_scale * 22)  # Hershey simplex cap height is about 22 px at scale 1
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total}" height="{total + top}" '
+        f'viewBox="0 0 {total} {total + top}">',
+        f'<rect width="100%" height="100%" fill="#ffffff"/>',
+    ]
+    if style.title:
+        parts.append(
+            f'<text x="{total / 2}" y="50" text-anchor="middle" font-family="Arial, sans-serif" '
+            f'font-size="40" font-weight="bold">{style.title}</text>'
+        )
+    for i in range(10):
+        pos = margin + i * cs
+        width = style.line_thickness * 2 if i % 3 == 0 else style.line_thickness
+        parts.append(
+            f'<path d="M{pos} {top + margin}V{top + total - margin}M{margin} {top + pos}H{total - margin}" '
+            f'stroke="#000000" stroke-width="{width}"/>'
+        )
+    parts.append(
+        f'<g font-family="Arial, sans-serif" font-size="{font_size}" font-weight="bold" '
+        f'text-anchor="middle" dominant-baseline="central">'
+    )
+    for r in range(9):
+        for c in range(9):
+            if digits[r, c]:
+                color = style.solved_color if solved[r, c] else style.given_color
+                x = margin + c * cs + cs / 2
+                y = top + margin + r * cs + cs / 2 + style.text_offset / 2
+                parts.append(f'<text x="{x:g}" y="{y:g}" fill="{_hex(color)}">{digits[r, c]}</text>')
+    parts.append("</g></svg>")
+    return "".join(parts)
+
+
+def _palette(style: RenderStyle) -> np.ndarray:
+    # White plus four anti-aliasing shades of each ink colour (at most 16 entries)
+    inks = list(dict.fromkeys([(0, 0, 0), style.given_color, style.solved_color]))
+    white = np.array([255, 255, 255], dtype=np.float32)
+    shades = [white + a * (np.array(ink, dtype=np.float32) - white) for ink in inks for a in (0.25, 0.5, 0.75, 1.0)]
+    return np.rint(np.stack([white] + shades)).astype(np.uint8)
+
+
+def _quantize(image: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    # Nearest palette entry per distinct colour; only used once per style on the atlas
+    keys = image.reshape(-1, 3).astype(np.int32) @ np.array([1 << 16, 1 << 8, 1], dtype=np.int32)
+    colors, inverse = np.unique(keys, return_inverse=True)
+    rgb = np.stack([colors >> 16, (colors >> 8) & 255, colors & 255], axis=1)
+    diff = rgb[:, None, :] - palette.astype(np.int32)
+    nearest = (diff * diff).sum(axis=-1).argmin(axis=-1).astype(np.uint8)
+    return nearest[inverse].reshape(image.shape[:-1])
+
+
+@lru_cache(maxsize=8)
+def palette_atlas(style: RenderStyle) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """glyph_atlas quantized to palette indices: (background, tiles, BGR palette)."""
+    background, tiles = glyph_atlas(style)
+    palette = _palette(style)
+    return _quantize(background, palette), _quantize(tiles, palette), palette
+
+
+def _palette_indices(grid, givens, style: RenderStyle) -> np.ndarray:
+    # Palette-index image composed directly from the quantized atlas
+    background, tiles, _ = palette_atlas(style)
+    indices = background.copy()
+    board = _board(indices, style)
+    glyphs = tiles[_tile_index(grid, givens)]
+    np.copyto(board, glyphs, where=glyphs > 0)
+    return indices
+
+
+def _encode_indices(indices: np.ndarray, style: RenderStyle) -> bytes:
+    from PIL import Image
+
+    out = Image.fromarray(indices, mode="P")
+    out.putpalette(palette_atlas(style)[2][:, ::-1].ravel().tolist())
+    buffer = io.BytesIO()
+    out.save(buffer, format="PNG", compress_level=6, bits=4)
+    return buffer.getvalue()
+
+
+def encode_png(grid, givens=None, style: RenderStyle = WEB_STYLE) -> bytes:
+    """Single-channel palette PNG composed directly from the quantized atlas."""
+    return _encode_indices(_palette_indices(grid, givens, style), style)
+
+
+def render_image(grid, givens=None, fmt: str = "png", style: RenderStyle = WEB_STYLE):
+    """
+    First half of render_bytes: lay out the grid for `fmt` without encoding it
+
+    Args:
+        grid: 9x9 or 81 digits (0 for empty cells)
+        givens: Optional puzzle, as for render_grid
+        fmt: png, webp or svg
+        style: RenderStyle preset
+
+    Returns:
+        Palette indices for png, a BGR image for webp, SVG text for svg
+    """
+    if fmt == "svg":
+        return render_svg(grid, givens, style)
+    if fmt == "png":
+        return _palette_indices(grid, givens, style)
+    if fmt == "webp":
+        return render_grid(grid, givens, style)
+    raise ValueError(f"Unknown image format '{fmt}'. Choose from: {', '.join(IMAGE_FORMATS)}")
+
+
+def encode_image(image, fmt: str = "png", style: RenderStyle = WEB_STYLE) -> bytes:
+    """Second half of render_bytes: encode what render_image returned for the same fmt and style."""
+    if fmt == "svg":
+        return image.encode("utf-8")
+    if fmt == "png":
+        return _encode_indices(image, style)
+    if fmt == "webp":
+        import cv2
+
+        ok, buffer = cv2.imencode(".webp", image, [cv2.IMWRITE_WEBP_QUALITY, 101])  # 101 = lossless
+        if not ok:
+            raise RuntimeError("WebP encoding is not available in this OpenCV build")
+        return buffer.tobytes()
+    raise ValueError(f"Unknown image format '{fmt}'. Choose from: {', '.join(IMAGE_FORMATS)}")
+
+
+def render_bytes(grid, givens=None, fmt: str = "png", style: RenderStyle = WEB_STYLE) -> bytes:
+    """Render and encode a grid as png (4-bit palette), webp (lossless) or svg."""
+    return encode_image(render_image(grid, givens, fmt, style), fmt, style)
@@ -0,0 +1,35 @@
+# sudoku_core/stats.py
+"""Search effort counters filled in by the solver backends."""
+from typing import Callable, Optional
+
+
+class SearchBudgetExceeded(Exception):
+    """Raised when a search passes its SearchStats node budget and nothing else was asked for."""
+
+
+class SearchStats:
+    """Nodes visited and dead ends backtracked from during one or more solves."""
+
+    __slots__ = ("nodes", "backtracks", "max_nodes", "on_budget")
+
+    def __init__(self, max_nodes: Optional[int] = None, on_budget: Optional[Callable[[], None]] = None):
+        self.nodes = 0        # search calls, i.e. partial assignments explored
+        self.backtracks = 0   # nodes that ended in a contradiction
+        # Backends call budget_reached() once nodes passes max_nodes
+        self.max_nodes = float("inf") if max_nodes is None else max_nodes
+        self.on_budget = on_budget
+
+    def budget_reached(self) -> None:
+        """
+        Lift the budget and run on_budget; without one, stop the search
+
+        on_budget can stop the search too, by raising; if it returns, the
+        search carries on where it was.
+        """
+        self.max_nodes = float("inf")
+        if self.on_budget is None:
+            raise SearchBudgetExceeded(f"more than {self.nodes - 1} nodes")
+        self.on_budget()
+
+    def __repr__(self) -> str:
+        return f"SearchStats(nodes={self.nodes}, backtracks={self.backtracks})"
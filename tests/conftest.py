@@ -0,0 +1,6 @@
+# tests/conftest.py
+"""Make the top-level modules (bench_solvers, sudoku_core, ...) importable under plain `pytest`."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
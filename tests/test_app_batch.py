@@ -0,0 +1,76 @@
+# tests/test_app_batch.py
+"""POST /solve/batch: input forms, per-line errors and the request limits."""
+import itertools
+import json
+
+import pytest
+
+import app
+from sudoku_core import find_solutions, format_puzzle_line, is_solution, parse_puzzle_line
+
+PUZZLE = app.WARM_UP_PUZZLE
+SOLUTION = find_solutions(parse_puzzle_line(PUZZLE), 1)[0]
+GRID = [parse_puzzle_line(PUZZLE)[r * 9:(r + 1) * 9] for r in range(9)]
+
+
+def post(body, **params):
+    response = app.app.test_client().post("/solve/batch", data=body, query_string=params)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return response, lines
+
+
+@pytest.mark.parametrize("encode", [json.dumps, lambda items: "\n".join(json.dumps(item) for item in items)],
+                         ids=["json-array", "ndjson"])
+def test_every_input_form_gets_its_line_in_order(encode):
+    items = [PUZZLE, GRID, {"id": "flat", "grid": parse_puzzle_line(PUZZLE)}, {"id": 7, "grid": PUZZLE}]
+    response, lines = post(encode(items))
+    assert response.status_code == 200 and response.mimetype == "application/x-ndjson"
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert [line.get("id") for line in lines] == [None, None, "flat", 7]
+    assert all(line["success"] and line["unique"] and "image" not in line for line in lines)
+    # Strings come back as strings, lists as 9x9 lists
+    assert lines[0]["solution"] == lines[3]["solution"] == format_puzzle_line(SOLUTION)
+    assert lines[1]["solution"] == lines[2]["solution"] == [SOLUTION[r * 9:(r + 1) * 9] for r in range(9)]
+
+
+def test_bad_entries_get_error_lines_and_the_rest_is_solved():
+    clash = "55" + "0" * 79
+    items = [PUZZLE[:80], [[0] * 9] * 8, parse_puzzle_line(PUZZLE)[:80] + [10], 42, clash, PUZZLE]
+    _, lines = post(json.dumps(items))
+    assert [line["success"] for line in lines] == [False, False, False, False, False, True]
+    assert all(line["error"] for line in lines[:5])
+    assert lines[4]["error"] == "No solution found"
+    assert is_solution(parse_puzzle_line(PUZZLE), parse_puzzle_line(lines[5]["solution"]))
+
+
+def test_images_only_on_request():
+    _, lines = post(json.dumps([PUZZLE]), images=1)
+    assert lines[0]["image"]
+
+
+@pytest.mark.parametrize("body, params", [("[1, 2", {}), ("not json", {}), (json.dumps([PUZZLE]), {"method": "nope"})])
+def test_unreadable_request_is_400(body, params):
+    response, _ = post(body, **params)
+    assert response.status_code == 400
+
+
+def test_too_many_puzzles_is_413(monkeypatch):
+    monkeypatch.setattr(app, "BATCH_MAX_PUZZLES", 2)
+    response = app.app.test_client().post("/solve/batch", data=json.dumps([PUZZLE] * 3))
+    assert response.status_code == 413
+    response, lines = post(json.dumps([PUZZLE] * 2))
+    assert response.status_code == 200 and len(lines) == 2
+
+
+def test_cpu_limit_skips_the_rest(monkeypatch):
+    # The request starts at 0 s of CPU and is past the limit when the second puzzle comes up
+    clock = itertools.chain([0.0, 0.0], itertools.repeat(app.BATCH_CPU_SECONDS + 1))
+    monkeypatch.setattr(app.time, "thread_time", lambda: next(clock))
+    _, lines = post(json.dumps([PUZZLE] * 4))
+    assert len(lines) == 2 and lines[0]["success"]
+    assert lines[1] == {
+        "index": 1,
+        "success": False,
+        "error": f"CPU time limit of {app.BATCH_CPU_SECONDS:g}s exceeded",
+        "skipped": 3,
+    }
@@ -0,0 +1,51 @@
+# tests/test_batch_solver.py
+"""sudoku_batch.solve_batch against the per-grid engine."""
+import numpy as np
+import pytest
+
+from bench_solvers import CORPORA, load_corpus
+from sudoku_batch import STATUS_PROPAGATED, STATUS_SEARCHED, STATUS_UNSOLVABLE, solve_batch
+from sudoku_core import solve_cells
+
+# Two 5s in the first row
+CLASH = [5, 5] + [0] * 79
+# No clashing givens, but the top-left cell has no candidate left
+STUCK = [0, 1, 2, 3, 4, 5, 6, 7, 8] + [9] + [0] * 71
+
+
+def as_batch(puzzles):
+    return np.array(puzzles, dtype=np.uint8).reshape(-1, 9, 9)
+
+
+def test_solutions_match_engine_on_all_corpora():
+    puzzles = [cells for corpus in sorted(CORPORA) for cells in load_corpus(corpus)]
+    solutions, status = solve_batch(as_batch(puzzles), chunk_size=16)
+    for cells, solution, code in zip(puzzles, solutions, status):
+        assert code in (STATUS_PROPAGATED, STATUS_SEARCHED)
+        assert solution.ravel().tolist() == solve_cells(cells)
+
+
+def test_status_tells_propagation_from_search():
+    easy = load_corpus("easy")
+    _, status = solve_batch(as_batch(easy))
+    assert (status == STATUS_PROPAGATED).all()
+    _, status = solve_batch(as_batch(load_corpus("hard")))
+    assert (status == STATUS_SEARCHED).any()
+
+
+def test_unsolvable_grids_keep_their_place_in_the_batch():
+    easy = load_corpus("easy")[0]
+    solutions, status = solve_batch(as_batch([easy, CLASH, STUCK, easy]), chunk_size=2)
+    assert status.tolist() == [STATUS_PROPAGATED, STATUS_UNSOLVABLE, STATUS_UNSOLVABLE, STATUS_PROPAGATED]
+    assert solutions[0].ravel().tolist() == solutions[3].ravel().tolist() == solve_cells(easy)
+
+
+def test_empty_batch():
+    solutions, status = solve_batch(np.zeros((0, 9, 9), dtype=np.uint8))
+    assert solutions.shape == (0, 9, 9) and status.shape == (0,)
+
+
+@pytest.mark.parametrize("grids", [np.zeros((9, 9)), np.zeros((2, 9, 8)), np.full((1, 9, 9), 10)])
+def test_rejects_bad_input(grids):
+    with pytest.raises(ValueError):
+        solve_batch(grids)
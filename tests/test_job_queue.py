@@ -0,0 +1,120 @@
+# tests/test_job_queue.py
+"""JobQueue behaviour, in memory and with job state shared through a store directory."""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from job_queue import DONE, FAILED, RUNNING, JobQueue, QueueFull
+
+SUDOKU_PNG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sudoku.png")
+
+
+def test_shared_store_answers_for_jobs_of_another_queue(tmp_path):
+    release = threading.Event()
+    runner = JobQueue(workers=1, max_pending=1, store_dir=str(tmp_path))
+    other = JobQueue(workers=1, max_pending=1, store_dir=str(tmp_path))
+    job = runner.submit(lambda report: release.wait(5) and {"answer": 42})
+
+    seen = other.get(job.id)
+    assert seen is not None and seen.state != DONE
+    # The pending limit counts jobs queued by every process sharing the store
+    with pytest.raises(QueueFull):
+        other.submit(lambda report: None)
+
+    release.set()
+    while seen.state != DONE:
+        other.wait(seen, seen.version, timeout=5)
+    assert seen.to_dict()["result"] == {"answer": 42}
+    assert other.stats()["pending"] == 0
+
+
+def test_full_queue_refuses_until_a_job_finishes():
+    release = threading.Event()
+    queue = JobQueue(workers=1, max_pending=1)
+    job = queue.submit(lambda report: release.wait(5))
+    with pytest.raises(QueueFull):
+        queue.submit(lambda report: None)
+    release.set()
+    while job.state != DONE:
+        queue.wait(job, job.version, 5)
+    queue.submit(lambda report: None)
+
+
+def test_stages_are_reported_in_order():
+    queue = JobQueue(workers=1)
+    step = threading.Semaphore(0)
+
+    def work(report):
+        for stage in ("decode", "locate", "ocr", "solve"):
+            step.acquire()
+            report(stage)
+        step.acquire()
+        return "solved"
+
+    job = queue.submit(work)
+    version = queue.wait(job, 0, 5)
+    seen = []
+    for _ in range(5):
+        seen.append((job.state, job.stage))
+        step.release()
+        version = queue.wait(job, version, 5)
+    assert seen == [(RUNNING, None), (RUNNING, "decode"), (RUNNING, "locate"), (RUNNING, "ocr"), (RUNNING, "solve")]
+    assert job.to_dict() == {"id": job.id, "state": DONE, "stage": "solve", "result": "solved"}
+
+
+def test_failed_job_reports_its_error():
+    queue = JobQueue(workers=1)
+
+    def work(report):
+        raise ValueError("no grid found")
+
+    job = queue.submit(work)
+    while job.state not in (DONE, FAILED):
+        queue.wait(job, job.version, 5)
+    assert job.to_dict() == {"id": job.id, "state": FAILED, "stage": None, "error": "no grid found"}
+
+
+def test_finished_jobs_expire_after_ttl():
+    release = threading.Event()
+    queue = JobQueue(workers=2, ttl=0.05)
+    running = queue.submit(lambda report: release.wait(5))
+    done = queue.submit(lambda report: 1)
+    while done.state != DONE:
+        queue.wait(done, done.version, 5)
+    time.sleep(0.1)
+    assert queue.get(done.id) is None
+    # Unfinished jobs never expire in memory
+    assert queue.get(running.id) is running
+    assert queue.stats()["jobs"] == 1
+    release.set()
+
+
+def test_upload_answers_429_when_the_queue_is_full(monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "job_queue", JobQueue(workers=1, max_pending=0))
+    with open(SUDOKU_PNG, "rb") as f:
+        response = app.app.test_client().post("/upload?async=1", data={"image": (f, "sudoku.png")})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_upload_job_streams_stages_then_done():
+    import app
+
+    client = app.app.test_client()
+    with open(SUDOKU_PNG, "rb") as f:
+        accepted = client.post("/upload?async=1", data={"image": (f, "sudoku.png")}).get_json()
+    body = client.get(accepted["events_url"]).get_data(as_text=True)
+    events = [(block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+              for block in body.split("\n\n") if block.startswith("event: ")]
+    stages = [data["stage"] for name, data in events if name == "stage" and data["stage"]]
+    order = ["decode", "locate", "ocr", "solve"]
+    assert stages == sorted(stages, key=order.index)
+    name, data = events[-1]
+    assert name == "done" and data["result"]["grid"][0][:2] == [5, 3]
+    assert client.get(accepted["status_url"]).get_json()["state"] == DONE
+    assert client.get("/jobs/unknown").status_code == 404
@@ -0,0 +1,52 @@
+# tests/test_ocr_cache.py
+"""The OCR cache must hit on copies of the same picture and miss on any changed digit."""
+import cv2
+import numpy as np
+import pytest
+
+from bench_pipeline import synthetic_photo
+from ocr_cache import OcrCache
+from sudoku_core import parse_puzzle_line
+from sudoku_to_csv import ocr_fingerprint, warp_puzzle
+
+PUZZLE = parse_puzzle_line("530070000600195000098000060800060003400803001700020006060000280000419005000080079")
+
+
+def photo(cells):
+    return synthetic_photo(cells, 1000, {}, np.random.default_rng(0))
+
+
+def fingerprint_of(image):
+    return ocr_fingerprint(cv2.cvtColor(warp_puzzle(image), cv2.COLOR_BGR2GRAY))
+
+
+def reencode(image, quality):
+    return cv2.imdecode(cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_COLOR)
+
+
+@pytest.fixture(scope="module")
+def cache():
+    cache = OcrCache()
+    cache.put(fingerprint_of(photo(PUZZLE)), "original", "cell")
+    return cache
+
+
+@pytest.mark.parametrize("copy", [
+    lambda image: reencode(image, 60),
+    lambda image: reencode(image, 30),
+    lambda image: (image * np.linspace(1.0, 0.6, image.shape[1])[None, :, None]).astype(np.uint8),
+    lambda image: cv2.resize(image, (700, 700), interpolation=cv2.INTER_AREA),
+], ids=["jpeg60", "jpeg30", "relit", "700px"])
+def test_copy_of_same_picture_hits(cache, copy):
+    assert cache.get(fingerprint_of(copy(photo(PUZZLE))), "cell") == "original"
+
+
+@pytest.mark.parametrize("index, digit", [(0, 8), (0, 3), (1, 5), (1, 8), (9, 5), (30, 5), (4, 1), (0, 0), (2, 4)])
+def test_one_changed_digit_misses(cache, index, digit):
+    cells = list(PUZZLE)
+    cells[index] = digit
+    assert cache.get(fingerprint_of(photo(cells)), "cell") is None
+
+
+def test_other_ocr_mode_misses(cache):
+    assert cache.get(fingerprint_of(photo(PUZZLE)), "batch") is None
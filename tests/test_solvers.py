@@ -0,0 +1,76 @@
+# tests/test_solvers.py
+"""Regression tests for the solver backends in sudoku_core."""
+import pytest
+
+from bench_solvers import CORPORA, load_corpus, resolve_solver
+from sudoku_core import SOLVERS, count_solutions, find_solutions, is_solution, solve_cells
+from sudoku_core.dlx import DancingLinks, _matrix, iter_solutions_dlx, solve_cells_dlx
+
+EMPTY = [0] * 81
+# Two 5s in the first row: no solution
+CONTRADICTION = [5, 5] + [0] * 79
+
+
+def matrix_links(matrix: DancingLinks):
+    return matrix.L, matrix.R, matrix.U, matrix.D, matrix.S
+
+
+@pytest.mark.parametrize("corpus", sorted(CORPORA))
+def test_backends_agree_on_corpus(corpus):
+    for cells in load_corpus(corpus):
+        bitmask = solve_cells(cells)
+        assert is_solution(cells, bitmask)
+        assert solve_cells_dlx(cells) == bitmask
+
+
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+def test_corpus_puzzles_are_unique(method):
+    for cells in load_corpus("hard"):
+        assert count_solutions(cells, method=method) == 1
+
+
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+@pytest.mark.parametrize("limit", [1, 2, 3, 5])
+def test_count_stops_at_limit(method, limit):
+    assert count_solutions(EMPTY, limit, method) == limit
+    solutions = find_solutions(EMPTY, limit, method)
+    assert len({tuple(s) for s in solutions}) == limit
+    assert all(is_solution(EMPTY, s) for s in solutions)
+
+
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+def test_unsolvable(method):
+    assert count_solutions(CONTRADICTION, method=method) == 0
+    assert SOLVERS[method](CONTRADICTION) is None
+
+
+def test_bitmask_returns_lexicographically_first_solution():
+    first = solve_cells(EMPTY)
+    assert first[:9] == list(range(1, 10))
+    assert first == min(find_solutions(EMPTY, 5, "bitmask"))
+
+
+def test_dlx_matrix_restored_after_early_stop():
+    # Covering the givens and leaving the search mid-way must uncover everything again
+    fresh = matrix_links(DancingLinks())
+    puzzle = load_corpus("hard")[0]
+
+    solve_cells_dlx(puzzle)
+    assert matrix_links(_matrix()) == fresh
+    find_solutions(EMPTY, 3, "dlx")
+    assert matrix_links(_matrix()) == fresh
+    solve_cells_dlx(CONTRADICTION)
+    assert matrix_links(_matrix()) == fresh
+
+    abandoned = iter_solutions_dlx(EMPTY)
+    next(abandoned)
+    abandoned.close()
+    assert matrix_links(_matrix()) == fresh
+    assert solve_cells_dlx(puzzle) == solve_cells(puzzle)
+
+
+def test_bench_adapts_in_place_grid_solvers():
+    solver = resolve_solver("grid:solve_sudoku:solve_sudoku")
+    for cells in load_corpus("hard"):
+        assert solver(cells) == solve_cells(cells)
+    assert solver(CONTRADICTION) is None
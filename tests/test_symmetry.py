@@ -0,0 +1,52 @@
+# tests/test_symmetry.py
+"""Canonical forms, search budgets and the /solve symmetry cache tier."""
+import random
+
+import pytest
+
+from bench_solvers import load_corpus, random_variant
+from sudoku_core import SOLVERS, SearchBudgetExceeded, SearchStats, find_solutions, is_solution, parse_puzzle_line
+from sudoku_symmetry import canonicalize
+
+# Takes the bitmask backend 788 nodes, well past the app's symmetry budget
+HARD = parse_puzzle_line("800000000003600000070090200050007000000045700000100030001000068008500010090000400")
+
+
+def test_symmetric_copies_share_a_canonical_form():
+    rng = random.Random(0)
+    for cells in load_corpus("hard")[:8]:
+        canonical, _ = canonicalize(cells)
+        for _ in range(3):
+            assert canonicalize(random_variant(cells, rng))[0] == canonical
+
+
+def test_transform_maps_solutions_both_ways():
+    variant = random_variant(HARD, random.Random(1))
+    canonical, transform = canonicalize(variant)
+    assert transform.apply(variant) == canonical
+    assert transform.invert(canonical) == variant
+    solution = find_solutions(variant, 1)[0]
+    assert is_solution(canonical, transform.apply(solution))
+    assert transform.invert(transform.apply(solution)) == solution
+
+
+@pytest.mark.parametrize("method", sorted(SOLVERS))
+def test_node_budget_stops_or_hands_over(method):
+    with pytest.raises(SearchBudgetExceeded):
+        find_solutions(HARD, 2, method, SearchStats(max_nodes=10))
+    calls = []
+    stats = SearchStats(max_nodes=10, on_budget=lambda: calls.append(stats.nodes))
+    # A hook that returns lets the search carry on to the same answer
+    assert find_solutions(HARD, 2, method, stats) == find_solutions(HARD, 2, method)
+    assert calls == [11] and stats.nodes > 11
+
+
+def test_solve_reuses_a_symmetric_copy():
+    import app
+
+    variant = random_variant(HARD, random.Random(2))
+    first, cached = app.solve_grid([HARD[r * 9:(r + 1) * 9] for r in range(9)], "bitmask", render=False)
+    assert cached is None
+    result, cached = app.solve_grid([variant[r * 9:(r + 1) * 9] for r in range(9)], "bitmask", render=False)
+    assert cached == "symmetry" and result["unique"]
+    assert is_solution(variant, [v for row in result["solution"] for v in row])
@@ -0,0 +1,146 @@
+# train_digit_classifier.py
+"""
+Build digit_prototypes.npz for the k-NN digit classifier.
+
+Digits 1-9 are rendered in every OpenCV Hershey font (plus Pillow's scalable
+default font and any --font TTF files) at several stroke widths, scales,
+small rotations, blur and noise levels. Each rendering goes through the same
+normalize_digit step used at recognition time, and per-digit k-means keeps a
+small set of prototypes. Real labelled grids can be mixed in with --sample.
+"""
+import argparse
+import csv
+import random
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from digit_classifier import DEFAULT_PROTOTYPES, normalize_digit
+
+HERSHEY_FONTS = [
+    cv2.FONT_HERSHEY_SIMPLEX,
+    cv2.FONT_HERSHEY_PLAIN,
+    cv2.FONT_HERSHEY_DUPLEX,
+    cv2.FONT_HERSHEY_COMPLEX,
+    cv2.FONT_HERSHEY_TRIPLEX,
+    cv2.FONT_HERSHEY_COMPLEX_SMALL,
+]
+CELL = 64
+
+
+def render_hershey(digit: int, font: int, thickness: int, scale: float) -> np.ndarray:
+    cell = np.full((CELL, CELL), 255, dtype=np.uint8)
+    text = str(digit)
+    (tw, th), _ = cv2.getTextSize(text, font, scale, thickness)
+    x = (CELL - tw) // 2
+    y = (CELL + th) // 2
+    cv2.putText(cell, text, (x, y), font, scale, 0, thickness, cv2.LINE_AA)
+    return cell
+
+
+def pil_fonts(paths: List[str]) -> list:
+    from PIL import ImageFont
+    fonts = []
+    for size in (36, 44):
+        try:
+            fonts.append(ImageFont.load_default(size=size))  # Pillow >= 10.1
+        except TypeError:
+            break
+    for path in paths:
+        fonts.extend(ImageFont.truetype(path, size) for size in (36, 44))
+    return fonts
+
+
+def render_pil(digit: int, font) -> np.ndarray:
+    from PIL import Image, ImageDraw
+    img = Image.new("L", (CELL, CELL), 255)
+    draw = ImageDraw.Draw(img)
+    left, top, right, bottom = draw.textbbox((0, 0), str(digit), font=font)
+    x = (CELL - (right - left)) // 2 - left
+    y = (CELL - (bottom - top)) // 2 - top
+    draw.text((x, y), str(digit), fill=0, font=font)
+    return np.array(img)
+
+
+def augment(cell: np.ndarray, rnd: random.Random) -> np.ndarray:
+    angle = rnd.uniform(-8, 8)
+    M = cv2.getRotationMatrix2D((CELL / 2, CELL / 2), angle, rnd.uniform(0.85, 1.1))
+    M[:, 2] += (rnd.uniform(-4, 4), rnd.uniform(-4, 4))
+    out = cv2.warpAffine(cell, M, (CELL, CELL), borderValue=255)
+    if rnd.random() < 0.5:
+        out = cv2.GaussianBlur(out, (3, 3), 0)
+    noise = np.random.default_rng(rnd.randrange(1 << 30)).normal(0, rnd.uniform(0, 12), out.shape)
+    return np.clip(out.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_samples(font_paths: List[str], variants: int, seed: int) -> Tuple[List[np.ndarray], List[int]]:
+    rnd = random.Random(seed)
+    tiles, labels = [], []
+    fonts = [("hershey", f, t, s) for f in HERSHEY_FONTS for t in (1, 2, 3) for s in (1.2, 1.6)]
+    fonts += [("pil", f) for f in pil_fonts(font_paths)]
+    for digit in range(1, 10):
+        for spec in fonts:
+            base = render_hershey(digit, *spec[1:]) if spec[0] == "hershey" else render_pil(digit, spec[1])
+            for v in range(variants):
+                cell = base if v == 0 else augment(base, rnd)
+                tiles.append(normalize_digit(cell))
+                labels.append(digit)
+    return tiles, labels
+
+
+def real_samples(image_path: str, grid_csv: str) -> Tuple[List[np.ndarray], List[int]]:
+    from sudoku_to_csv import split_into_cells, warp_puzzle
+
+    with open(grid_csv, newline="", encoding="utf-8") as f:
+        truth = [int(v) for row in csv.reader(f) for v in row]
+    bgr = cv2.imread(image_path)
+    if bgr is None:
+        raise RuntimeError(f"Failed to read image: {image_path}")
+    warped = warp_puzzle(bgr)
+    cells = split_into_cells(cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY))
+    pairs = [(normalize_digit(cell), d) for cell, d in zip(cells.reshape(81, *cells.shape[2:]), truth) if d]
+    return [t for t, _ in pairs], [d for _, d in pairs]
+
+
+def build_prototypes(tiles: List[np.ndarray], labels: List[int], per_class: int) -> Tuple[np.ndarray, np.ndarray]:
+    tiles_arr = np.stack(tiles)
+    labels_arr = np.array(labels)
+    out_tiles, out_labels = [], []
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 50, 0.5)
+    cv2.setRNGSeed(0)
+    for digit in range(1, 10):
+        x = tiles_arr[labels_arr == digit].reshape(-1, tiles_arr.shape[1] * tiles_arr.shape[2]).astype(np.float32)
+        k = min(per_class, len(x))
+        _, _, centers = cv2.kmeans(x, k, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+        out_tiles.append(np.clip(centers, 0, 255).round().astype(np.uint8).reshape(k, *tiles_arr.shape[1:]))
+        out_labels.extend([digit] * k)
+    return np.concatenate(out_tiles), np.array(out_labels, dtype=np.uint8)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Train the bundled k-NN digit prototypes.")
+    ap.add_argument("--out", default=DEFAULT_PROTOTYPES, help="Output .npz path.")
+    ap.add_argument("--per-class", type=int, default=40, help="Prototypes kept per digit.")
+    ap.add_argument("--variants", type=int, default=6, help="Augmented renderings per font setting.")
+    ap.add_argument("--font", action="append", default=[], help="Extra TTF font to render (repeatable).")
+    ap.add_argument("--sample", nargs=2, action="append", default=[], metavar=("IMAGE", "GRID_CSV"),
+                    help="Real puzzle image with its 9x9 ground-truth CSV (repeatable).")
+    ap.add_argument("--seed", type=int, default=0)
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    tiles, labels = synthetic_samples(args.font, args.variants, args.seed)
+    for image_path, grid_csv in args.sample:
+        t, l = real_samples(image_path, grid_csv)
+        tiles += t
+        labels += l
+    protos, proto_labels = build_prototypes(tiles, labels, args.per_class)
+    np.savez_compressed(args.out, tiles=protos, labels=proto_labels)
+    print(f"SUCCESS: {len(tiles)} samples -> {len(protos)} prototypes written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()